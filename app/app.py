@@ -5,49 +5,93 @@ import streamlit as st
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.Database import Database
+from services.LocationService import LocationService
+
 from core.Logger import Logger
 
 st.set_page_config(page_title="Idealista Scraper", page_icon="🏠", layout="wide")
 
 st.title("🏠 Idealista Scraper")
 
-logger = Logger("streamlit_app")
-db = Database(logger)
-
 
-@st.cache_data(ttl=600)
-def load_locations():
-    locations = db.get_locations()
-    return locations
+@st.cache_resource
+def get_location_service() -> LocationService:
+    # One service, and so one cache, shared by every session of the app.
+    return LocationService(Logger("streamlit_app"))
 
 
-locations = load_locations()
+location_service = get_location_service()
+locations = location_service.get_locations_by_id()
 
 if not locations:
     st.error("❌ No se encontraron ubicaciones en la base de datos.")
 else:
-    location_options = {
-        f"{loc['title']} ({loc['number_of_properties']} propiedades)": loc["path"]
-        for loc in locations
-    }
-
     st.subheader("Selecciona una ubicación:")
-    selected_location = st.selectbox(
+    location_id = st.selectbox(
         "Ubicación",
-        options=list(location_options.keys()),
+        options=list(locations.keys()),
         index=0,
+        format_func=lambda id: (
+            f"{locations[id]['title']} ({locations[id]['number_of_properties']} propiedades)"
+        ),
         help="Selecciona la ubicación para ver sus propiedades",
     )
 
-    location_id = location_options[selected_location]
-
-    selected_loc = next((loc for loc in locations if loc["path"] == location_id), None)
-
-    if selected_loc:
-        st.write(f"**Ubicación seleccionada:** {selected_loc['title']}")
-        st.write(f"**Número de propiedades:** {selected_loc['number_of_properties']}")
-        st.write(f"**URL:** {selected_loc['path'].replace('mapa', '')}")
+    selected_loc = locations[location_id]
+    st.write(f"**Ubicación seleccionada:** {selected_loc['title']}")
+    st.write(f"**Número de propiedades:** {selected_loc['number_of_properties']}")
+    st.write(f"**URL:** {selected_loc['path'].replace('mapa', '')}")
+
+    if st.button("Actualizar datos"):
+        location_service.invalidate(location_id)
+
+    stats = location_service.get_location_stats(location_id)
+    if stats:
+        columns = st.columns(4)
+        columns[0].metric("Propiedades analizadas", stats["scraped_properties"])
+        columns[1].metric("Precio medio", f"{stats['mean_price']:,.0f} €")
+        columns[2].metric(
+            "€/m² medio", f"{stats['mean_price_per_square_meter']:,.0f} €"
+        )
+        columns[3].metric(
+            "€/m² mediano", f"{stats['median_price_per_square_meter']:,.0f} €"
+        )
+        st.caption(f"Actualizado: {stats['updated_at']}")
+    else:
+        st.info("Todavía no hay estadísticas para esta ubicación.")
+
+    st.subheader("Filtros")
+    columns = st.columns(4)
+    min_price = columns[0].number_input("Precio mínimo (€)", min_value=0, step=10000)
+    max_price = columns[1].number_input("Precio máximo (€)", min_value=0, step=10000)
+    min_surface = columns[2].number_input(
+        "Superficie mínima (m²)", min_value=0, step=10
+    )
+    min_rooms = columns[3].number_input("Habitaciones mínimas", min_value=0, step=1)
+    columns = st.columns(4)
+    flags = {
+        flag: True
+        for flag, label, column in (
+            ("has_pool", "Piscina", columns[0]),
+            ("has_garage", "Garaje", columns[1]),
+            ("has_terrace", "Terraza", columns[2]),
+            ("has_garden", "Jardín", columns[3]),
+        )
+        if column.checkbox(label)
+    }
+    # A zero means the bound is not set.
+    counts = location_service.get_filter_counts(
+        {
+            "price_amount": (min_price or None, max_price or None),
+            "square_meters": (min_surface or None, None),
+            "rooms": (min_rooms or None, None),
+        },
+        flags,
+    )
+    matching, near_matching = counts.for_location(location_id)
+    columns = st.columns(2)
+    columns[0].metric("Propiedades que cumplen los filtros", matching)
+    columns[1].metric("Propiedades cerca de cumplirlos (±5%)", near_matching)
 
-        if st.button("Ver propiedades"):
-            st.info("Funcionalidad para mostrar propiedades en desarrollo...")
+    if st.button("Ver propiedades"):
+        st.info("Funcionalidad para mostrar propiedades en desarrollo...")
@@ -1,11 +1,29 @@
+import threading
+
+from constants.constants import DASHBOARD_CACHE_TTL
+from core.AnalyticsStore import AnalyticsStore
 from core.Database import Database
+from core.FilterIndex import COLUMNS as FILTER_COLUMNS
+from core.FilterIndex import FilterCounts, FilterIndex
+from core.KeyedCache import KeyedCache
 from core.Logger import Logger
+from core.MarketMetrics import latest_snapshot
 
 
 class LocationService:
-    def __init__(self, logger: Logger):
+    def __init__(
+        self,
+        logger: Logger,
+        ttl: float = DASHBOARD_CACHE_TTL,
+        analytics_store: AnalyticsStore | None = None,
+    ):
         self.logger = logger
         self.db = Database(logger)
+        self.cache = KeyedCache(ttl)
+        self.analytics_store = analytics_store or AnalyticsStore(logger)
+        self.filter_index = FilterIndex()
+        self._filter_lock = threading.Lock()
+        self._indexed_since: str | None = None
 
     def get_all_locations(self) -> list[dict]:
         try:
@@ -15,3 +33,49 @@ class LocationService:
         except Exception as e:
             self.logger.error(f"Error retrieving locations: {str(e)}")
             return []
+
+    def get_locations_by_id(self) -> dict[str, dict]:
+        return self.cache.get("locations", self._load_locations_by_id)
+
+    def get_location_stats(self, location_id: str) -> dict | None:
+        return self.cache.get(
+            ("stats", location_id), lambda: self.db.get_location_stats(location_id)
+        )
+
+    def get_filter_counts(
+        self,
+        ranges: dict[str, tuple[float | None, float | None]],
+        flags: dict[str, bool],
+    ) -> FilterCounts:
+        """Matching and near-matching listings per location."""
+        self.cache.get("filter_index", self._refresh_filter_index)
+        with self._filter_lock:
+            return self.filter_index.count(ranges, flags)
+
+    def invalidate(self, location_id: str | None = None) -> None:
+        if location_id is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(("stats", location_id))
+
+    def _refresh_filter_index(self) -> int:
+        # Only the partitions scraped since the last refresh are read; the
+        # last day is read again as it may have grown since.
+        table = latest_snapshot(
+            self.analytics_store.load(
+                columns=[*FILTER_COLUMNS, "is_partial", "scrape_date"],
+                since=self._indexed_since,
+            )
+        )
+        with self._filter_lock:
+            self.filter_index.add_table(table)
+        if table.num_rows:
+            self._indexed_since = max(table.column("scrape_date").to_pylist())
+        self.logger.info(f"Indexed {len(self.filter_index)} properties for filters")
+        return len(self.filter_index)
+
+    def _load_locations_by_id(self) -> dict[str, dict]:
+        locations = self.db.get_location_summaries()
+        self.logger.info(f"Retrieved {len(locations)} locations from database")
+        # Insertion order keeps the database order (by number of properties).
+        return {location["id"]: location for location in locations}
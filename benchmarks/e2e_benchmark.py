@@ -0,0 +1,223 @@
+"""
+Runs IdealistaScraper and LocationsScraper end to end against a local
+stand-in for Idealista and an in-memory database, and reports throughput,
+per-stage latency and peak RSS as JSON.
+
+Usage:
+    uv run -m benchmarks.e2e_benchmark [--locations 20] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tomllib
+from collections import defaultdict
+from contextlib import contextmanager
+
+from benchmarks.fake_database import InMemoryDatabase
+from benchmarks.fixture_server import FixtureServer
+from constants.constants import MAX_CONCURRENT_REQUESTS, PARSE_WORKERS
+from core.Logger import Logger
+from scraper.IdealistaScraper import IdealistaScraper
+from scraper.LocationsScraper import LocationsScraper
+from scraper.RateLimiter import RateLimiter
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(time.perf_counter() - start)
+
+    def summary(self) -> dict:
+        return {
+            stage: {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+            }
+            for stage, values in self.samples.items()
+        }
+
+
+class TimedSession:
+    """Wraps the session a scraper opens to time every request."""
+
+    def __init__(self, session, timer: StageTimer):
+        self.session = session
+        self.timer = timer
+
+    async def __aenter__(self):
+        self.opened = await self.session.__aenter__()
+        return self
+
+    async def __aexit__(self, *args):
+        return await self.session.__aexit__(*args)
+
+    async def get(self, url: str, **kwargs):
+        with self.timer.measure("fetch"):
+            return await self.opened.get(url, **kwargs)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def instrument(scraper, timer: StageTimer) -> None:
+    open_session = scraper._open_session
+    scraper._open_session = lambda: TimedSession(open_session(), timer)
+
+    if hasattr(scraper, "_parse"):
+        parse = scraper._parse
+
+        async def timed_parse(*args):
+            with timer.measure("parse"):
+                return await parse(*args)
+
+        scraper._parse = timed_parse
+
+
+def write_stage(database: InMemoryDatabase) -> dict:
+    return {
+        "count": len(database.write_latencies),
+        "p50_ms": percentile(database.write_latencies, 0.50) * 1000,
+        "p99_ms": percentile(database.write_latencies, 0.99) * 1000,
+        "rows": sum(database.write_sizes),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux; children covers the parse workers.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024
+
+
+def version() -> dict:
+    with open("pyproject.toml", "rb") as pyproject:
+        package_version = tomllib.load(pyproject)["project"]["version"]
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"version": package_version, "commit": commit}
+
+
+async def bench_idealista(args, logger: Logger) -> dict:
+    locations = [
+        {
+            "id": f"location-{index}",
+            "title": f"Location {index}",
+            "path": f"/venta-viviendas/location-{index}/mapa",
+            "number_of_properties": args.properties,
+        }
+        for index in range(args.locations)
+    ]
+    database = InMemoryDatabase(locations)
+    timer = StageTimer()
+
+    with FixtureServer(
+        {location["path"]: args.properties for location in locations},
+        latency=args.latency_ms / 1000,
+    ) as server:
+        scraper = IdealistaScraper(
+            database,
+            logger,
+            RateLimiter(float("inf")),
+            max_concurrency=args.max_concurrency,
+            location_workers=args.workers,
+            parse_workers=args.parse_workers,
+            base_url=server.base_url,
+        )
+        instrument(scraper, timer)
+        start = time.perf_counter()
+        await scraper.run()
+        elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_s": elapsed,
+        "requests": dict(server.requests),
+        "pages_per_s": server.requests["result"] / elapsed,
+        "properties_per_s": len(database.properties) / elapsed,
+        "properties": len(database.properties),
+        "stages": {**timer.summary(), "write": write_stage(database)},
+    }
+
+
+async def bench_locations(args, logger: Logger) -> dict:
+    database = InMemoryDatabase()
+    timer = StageTimer()
+
+    with FixtureServer({}, latency=args.latency_ms / 1000) as server:
+        scraper = LocationsScraper(
+            logger,
+            database,
+            RateLimiter(float("inf")),
+            locations_url=server.locations_url,
+        )
+        instrument(scraper, timer)
+        start = time.perf_counter()
+        await scraper.run()
+        elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_s": elapsed,
+        "requests": dict(server.requests),
+        "pages_per_s": server.requests["suggest"] / elapsed,
+        "locations": len(database.locations),
+        "stages": {**timer.summary(), "write": write_stage(database)},
+    }
+
+
+async def main(args: argparse.Namespace):
+    logger = Logger(log_file=os.devnull, level=args.log_level)
+    results = {
+        **version(),
+        "parameters": vars(args),
+        "idealista": await bench_idealista(args, logger),
+        "locations": await bench_locations(args, logger),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    output = json.dumps(results, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--properties", type=int, default=90)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENT_REQUESTS)
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
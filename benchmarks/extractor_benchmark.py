@@ -0,0 +1,113 @@
+"""
+Compares the legacy BeautifulSoup.prettify() extractor against PropertyParser.
+
+Usage:
+    uv run -m benchmarks.extractor_benchmark [saved_detail_page.html ...]
+
+Without arguments it runs on generated fixture pages.
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixtures import detail_page
+from constants.constants import BASE_URL
+from core.Logger import Logger
+from core.models.Property import Property
+from scraper.PropertyParser import PropertyParser
+
+
+def legacy_extract(html: str, property_url: str) -> dict | None:
+    """The extractor as it was before PropertyParser, kept as the reference."""
+    soup = BeautifulSoup(html, "lxml")
+    regex = re.compile(r"var\s*utag_data\s*=\s*(\{.*?\});", re.DOTALL)
+    script_text = regex.search(soup.prettify())
+    if not script_text:
+        return None
+    try:
+        data = json.loads(script_text.group(1))
+    except json.JSONDecodeError:
+        return None
+
+    def text(tag: str, class_name: str) -> str:
+        found = soup.find(tag, class_=class_name)
+        return found.get_text(strip=True) if found else ""
+
+    ad = data.get("ad", {})
+    characteristics = ad.get("characteristics", {})
+    condition = ad.get("condition", {})
+    return {
+        "rooms": characteristics.get("roomNumber") or 0,
+        "bathrooms": characteristics.get("bathNumber") or 0,
+        "square_meters": characteristics.get("constructedArea") or 0,
+        "has_garage": characteristics.get("hasParking", "") == "1",
+        "has_garden": characteristics.get("hasGarden", "") == "1",
+        "has_pool": characteristics.get("hasSwimmingPool", "") == "1",
+        "has_terrace": characteristics.get("hasTerrace", "") == "1",
+        "is_new_development": condition.get("isNewDevelopment", "") == "1",
+        "needs_renovation": condition.get("isNeedsRenovating", "") == "1",
+        "is_in_good_condition": condition.get("isGoodCondition", "") == "1",
+        "price": {"amount": float(ad.get("price", 0)), "currency": "EUR"},
+        "agency_name": data.get("agency", {}).get("name", ""),
+        "title": text("span", "main-info__title-main"),
+        "description": text("div", "ad-comment"),
+        "address": text("span", "main-info__address-text"),
+        "location": text("span", "main-info__title-minor"),
+        "url": f"{BASE_URL}{property_url}",
+        "is_illegally_occupied": soup.find("span", string="Ocupada ilegalmente")
+        is not None,
+        "id": ad.get("id", ""),
+    }
+
+
+def load_pages(paths: list[str], count: int) -> list[tuple[str, bytes]]:
+    if paths:
+        return [(f"/inmueble/{Path(p).stem}/", Path(p).read_bytes()) for p in paths]
+    return [
+        (f"/inmueble/{ad_id}/", detail_page(str(ad_id)).encode("utf-8"))
+        for ad_id in range(100_000, 100_000 + count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pages", nargs="*", help="Saved detail pages (HTML)")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.count)
+    fast = PropertyParser(Logger(level="WARNING"))
+
+    for url, content in pages:
+        expected = legacy_extract(content.decode("utf-8", errors="replace"), url)
+        actual = fast.parse(content, url)
+        if expected is None or actual is None:
+            assert expected is None and actual is None, url
+            continue
+        assert Property(**expected) == Property(**actual), url
+
+    timings = {}
+    for name, extract in (
+        ("legacy", lambda u, c: legacy_extract(c.decode("utf-8", errors="replace"), u)),
+        ("fast", lambda u, c: fast.parse(c, u)),
+    ):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for url, content in pages:
+                extract(url, content)
+        timings[name] = (time.perf_counter() - start) / (args.rounds * len(pages))
+
+    print(f"pages: {len(pages)}, outputs identical")
+    for name, per_page in timings.items():
+        print(f"{name:>6}: {per_page * 1000:8.2f} ms/page")
+    print(f"speedup: {timings['legacy'] / timings['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import time
+
+from core.models.PropertyRecord import CARD_UPDATE_COLUMNS
+
+
+class InMemoryDatabase:
+    """
+    In-memory fake of core.Database for offline runs.
+
+    Implements the methods the scrapers call, upserting by id like the real
+    one, and records the latency and size of every write.
+    """
+
+    def __init__(self, locations: list[dict] | None = None):
+        self.locations: dict[str, dict] = {
+            location["id"]: location for location in locations or []
+        }
+        self.properties: dict[str, dict] = {}
+        self.location_stats: dict[str, dict] = {}
+        self.write_latencies: list[float] = []
+        self.write_sizes: list[int] = []
+
+    def get_locations(self) -> list[dict]:
+        return sorted(
+            self.locations.values(),
+            key=lambda location: location.get("number_of_properties") or 0,
+            reverse=True,
+        )
+
+    def get_location_ids(self) -> list[dict]:
+        return [
+            {
+                "id": location["id"],
+                "path": location["path"],
+                "created_at": location.get("created_at"),
+            }
+            for location in self.locations.values()
+        ]
+
+    def insert_locations(self, locations: list[dict], batch_size: int | None = None):
+        return self._upsert(self.locations, locations)
+
+    def insert_properties(self, properties: list[dict], batch_size: int | None = None):
+        self._upsert(self.properties, properties)
+        return {row["id"] for row in properties}
+
+    def insert_partial_properties(
+        self, properties: list[dict], batch_size: int | None = None
+    ):
+        start = time.perf_counter()
+        for row in properties:
+            stored = self.properties.get(row["id"])
+            if stored is None:
+                self.properties[row["id"]] = dict(row)
+            else:
+                stored.update((column, row[column]) for column in CARD_UPDATE_COLUMNS)
+        self.write_latencies.append(time.perf_counter() - start)
+        self.write_sizes.append(len(properties))
+        return {row["id"] for row in properties}
+
+    def upsert_location_stats(self, stats: list[dict]) -> bool:
+        # Not timed: the benchmark's write stage is about property rows.
+        for row in stats:
+            self.location_stats[row["location_id"]] = dict(row)
+        return len(stats) > 0
+
+    def get_location_stats(self, location_id: str) -> dict | None:
+        return self.location_stats.get(location_id)
+
+    def _upsert(self, table: dict[str, dict], rows: list[dict]) -> bool:
+        start = time.perf_counter()
+        for row in rows:
+            table[row["id"]] = dict(row)
+        self.write_latencies.append(time.perf_counter() - start)
+        self.write_sizes.append(len(rows))
+        return len(rows) > 0
@@ -0,0 +1,138 @@
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fixtures import (
+    detail_page,
+    location_suggestions,
+    result_page,
+)
+from constants.constants import PROPERTIES_PER_PAGE
+
+DETAIL_PATH_REGEX = re.compile(r"^/inmueble/(\d+)/$")
+RESULT_PAGE_REGEX = re.compile(
+    r"^(?P<location>/venta-viviendas/[^/]+/)(?:pagina-(?P<page>\d+)\.htm)?$"
+)
+SUGGEST_PATH = "/es/locationsSuggest/sale/home"
+
+
+class FixtureServer:
+    """
+    Local stand-in for Idealista serving generated fixture pages.
+
+    `locations` maps a location path (as stored in the Locations table) to
+    its number of listings. Pages are generated on first request and kept in
+    memory, so the server costs little once warm. `latency` adds a fixed
+    delay per response to mimic a remote host.
+    """
+
+    def __init__(self, locations: dict[str, int], latency: float = 0.0):
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self._ad_ids = {
+            path.replace("mapa", ""): [f"{index:04d}{ad:05d}" for ad in range(count)]
+            for index, (path, count) in enumerate(locations.items())
+        }
+        self._pages: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def locations_url(self) -> str:
+        return f"{self.base_url}{SUGGEST_PATH}?searchField="
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def render(self, path: str, query: str) -> tuple[int, str, bytes]:
+        if path == SUGGEST_PATH:
+            prefix = parse_qs(query).get("searchField", [""])[0]
+            self._count("suggest")
+            return (
+                200,
+                "application/json",
+                json.dumps(location_suggestions(prefix)).encode("utf-8"),
+            )
+
+        if match := DETAIL_PATH_REGEX.match(path):
+            self._count("detail")
+            return (
+                200,
+                "text/html; charset=utf-8",
+                self._cached(path, lambda: detail_page(match.group(1))),
+            )
+
+        match = RESULT_PAGE_REGEX.match(path)
+        if match and match.group("location") in self._ad_ids:
+            self._count("result")
+            ad_ids = self._ad_ids[match.group("location")]
+            page = int(match.group("page") or 1)
+            start = (page - 1) * PROPERTIES_PER_PAGE
+            end = start + PROPERTIES_PER_PAGE
+            return (
+                200,
+                "text/html; charset=utf-8",
+                self._cached(
+                    path,
+                    lambda: result_page(
+                        match.group("location"),
+                        ad_ids[start:end],
+                        page,
+                        end < len(ad_ids),
+                    ),
+                ),
+            )
+
+        self._count("not_found")
+        return 404, "text/plain", b"Not found"
+
+    def _cached(self, key: str, build) -> bytes:
+        with self._lock:
+            page = self._pages.get(key)
+        if page is None:
+            page = build().encode("utf-8")
+            with self._lock:
+                self._pages[key] = page
+        return page
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                url = urlsplit(self.path)
+                status, content_type, body = server.render(url.path, url.query)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
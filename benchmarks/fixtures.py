@@ -0,0 +1,141 @@
+import json
+import random
+
+FILLER_BLOCK = (
+    '<div class="detail-info-block"><ul class="details-property_features">'
+    + "".join(f"<li>Característica {i}</li>" for i in range(12))
+    + "</ul></div>"
+)
+
+
+def listing_price(ad_id: str) -> int:
+    return random.Random(f"price-{ad_id}").randrange(60_000, 900_000, 1_000)
+
+
+def format_price(price: int) -> str:
+    return f"{price:,}".replace(",", ".")
+
+
+def detail_page(ad_id: str, seed: int | None = None, filler_blocks: int = 400) -> str:
+    """Builds an HTML detail page shaped like an Idealista listing."""
+    rng = random.Random(seed if seed is not None else ad_id)
+    utag_data = {
+        "ad": {
+            "id": ad_id,
+            "price": str(listing_price(ad_id)),
+            "characteristics": {
+                "roomNumber": rng.randint(1, 5),
+                "bathNumber": rng.randint(1, 3),
+                "constructedArea": rng.randint(40, 250),
+                "hasParking": rng.choice(["0", "1"]),
+                "hasGarden": rng.choice(["0", "1"]),
+                "hasSwimmingPool": rng.choice(["0", "1"]),
+                "hasTerrace": rng.choice(["0", "1"]),
+            },
+            "condition": {
+                "isNewDevelopment": rng.choice(["0", "1"]),
+                "isNeedsRenovating": rng.choice(["0", "1"]),
+                "isGoodCondition": rng.choice(["0", "1"]),
+            },
+        },
+        "agency": {"name": f"Inmobiliaria {rng.randint(1, 50)}"},
+    }
+    occupied = (
+        '<span class="tag">Ocupada ilegalmente</span>' if rng.random() < 0.1 else ""
+    )
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Piso en venta {ad_id}</title>
+<script>var dataLayer = [];</script>
+<script type="text/javascript">
+    var utag_data = {json.dumps(utag_data)};
+</script>
+</head>
+<body>
+<main>
+<section class="main-info">
+<h1><span class="main-info__title-main">Piso en venta en calle Mayor, {ad_id}</span></h1>
+<span class="main-info__title-minor">Centro, Madrid</span>
+<span class="main-info__address-text"> Calle Mayor, {rng.randint(1, 200)} </span>
+{occupied}
+</section>
+<div class="comment"><div class="ad-comment"><p>Luminoso piso <b>reformado</b> con vistas.</p>
+<p>Cerca de metro y servicios.</p><!-- ref {ad_id} --></div></div>
+{FILLER_BLOCK * filler_blocks}
+</main>
+</body>
+</html>"""
+
+
+def result_page(
+    location_path: str, ad_ids: list[str], page: int, has_next: bool
+) -> str:
+    """Builds a search result page with one card per ad and `li.next` pagination."""
+    cards = "".join(
+        f"""<article class="item extended-item" data-element-id="{ad_id}">
+<div class="item-info-container">
+<a href="/inmueble/{ad_id}/" role="heading" class="item-link" title="Piso {ad_id}">Piso en calle Mayor, {ad_id}</a>
+<div class="price-row"><span class="item-price h2-simulated">{format_price(listing_price(ad_id))}<span class="txt-big">€</span></span></div>
+<div class="item-detail-char"><span class="item-detail">3 hab.</span><span class="item-detail">90 m²</span></div>
+</div>
+</article>"""
+        for ad_id in ad_ids
+    )
+    pagination = (
+        f'<li class="next"><a href="{location_path}pagina-{page + 1}.htm">Siguiente</a></li>'
+        if has_next
+        else ""
+    )
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Pisos en venta</title></head>
+<body>
+<main class="listing-items">{cards}</main>
+<div class="pagination"><ul><li class="selected"><span>{page}</span></li>{pagination}</ul></div>
+</body>
+</html>"""
+
+
+SYLLABLES = (
+    "al",
+    "ba",
+    "ca",
+    "de",
+    "el",
+    "fu",
+    "ga",
+    "la",
+    "ma",
+    "no",
+    "ra",
+    "san",
+    "to",
+    "vi",
+)
+# Every synthetic town, sorted like a suggestion index.
+TOWNS = sorted(
+    {
+        "".join(random.Random(i).choices(SYLLABLES, k=random.Random(-i).randint(2, 4)))
+        for i in range(3_000)
+    }
+)
+
+
+def location_suggestions(prefix: str, limit: int = 10) -> list[dict]:
+    """
+    Builds a locationsSuggest response for a search prefix: the first
+    `limit` towns starting with it, cut off silently like Idealista does.
+    """
+    return [
+        {
+            "text": f"<b>{town[: len(prefix)].capitalize()}</b>{town[len(prefix) :]}",
+            "count": random.Random(town).randint(0, 2_000),
+            "zoneOfInterest": len(town) % 2 == 0,
+            "category": "municipality",
+            "url": f"/venta-viviendas/{town}/mapa",
+        }
+        for town in TOWNS
+        if town.startswith(prefix)
+    ][:limit]
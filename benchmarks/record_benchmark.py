@@ -0,0 +1,95 @@
+"""
+Compares building Properties rows through the Property/Money pydantic models
+against PropertyRecord, on the fields PropertyParser extracts.
+
+Usage:
+    uv run -m benchmarks.record_benchmark [--rows 2000] [--rounds 5]
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.fixtures import detail_page
+from constants.constants import BASE_URL
+from core.Logger import Logger
+from core.models.Property import Property
+from core.models.PropertyRecord import PropertyRecord
+from scraper.PropertyParser import PropertyParser
+
+LOCATION_ID = "location-0"
+
+
+def pydantic_row(details: dict, location_id: str) -> dict:
+    """The row building as it was before PropertyRecord, kept as the reference."""
+    property = Property(**details)
+    fields = property.model_dump()
+    return {
+        **{k: v for k, v in fields.items() if k != "price"},
+        "price_amount": property.price.get_amount(),
+        "price_currency": property.price.get_currency(),
+        "location_id": location_id,
+    }
+
+
+def record_row(details: dict, location_id: str) -> dict:
+    return PropertyRecord.from_details(details, location_id).to_row()
+
+
+def check_same_rules(details: dict) -> None:
+    """Both paths must accept and reject the same input."""
+    invalid = [
+        {**details, "price": {"amount": -1, "currency": "EUR"}},
+        {**details, "price": {"amount": 1, "currency": "JPY"}},
+        {**details, "rooms": "tres"},
+        {k: v for k, v in details.items() if k != "title"},
+    ]
+    for item in invalid:
+        for build in (pydantic_row, record_row):
+            try:
+                build(item, LOCATION_ID)
+            except ValueError:
+                continue
+            raise AssertionError(f"{build.__name__} accepted {item}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    property_parser = PropertyParser(Logger(log_file=os.devnull), BASE_URL)
+    # Parse a few pages and repeat them: the benchmark is about rows, not HTML.
+    parsed = [
+        property_parser.parse(
+            detail_page(str(ad_id), filler_blocks=0).encode("utf-8"),
+            f"/inmueble/{ad_id}/",
+        )
+        for ad_id in range(100)
+    ]
+    details = [parsed[i % len(parsed)] for i in range(args.rows)]
+
+    for item in parsed:
+        assert pydantic_row(item, LOCATION_ID) == record_row(item, LOCATION_ID)
+    check_same_rules(parsed[0])
+
+    timings = {}
+    for name, build in (
+        ("pydantic", lambda: [pydantic_row(d, LOCATION_ID) for d in details]),
+        ("record", lambda: [record_row(d, LOCATION_ID) for d in details]),
+        ("batch", lambda: PropertyRecord.validate_batch(details, LOCATION_ID)),
+    ):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            build()
+        timings[name] = (time.perf_counter() - start) / (args.rounds * args.rows)
+
+    print(f"rows: {args.rows}, outputs identical")
+    for name, per_row in timings.items():
+        print(f"{name:>8}: {per_row * 1e6:8.2f} µs/row")
+    print(f" speedup: {timings['pydantic'] / timings['batch']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
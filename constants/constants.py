@@ -1,6 +1,64 @@
+import os
+
 LOCATION_MAP = {"0-EU-ES-35-03-002-034-02-001": "Montaña Roja, Yaiza"}
 CURRENCY_MAP = {"€": "EUR", "$": "USD", "£": "GBP"}
 BASE_URL = "https://www.idealista.com"
 LOCATIONS_BASE_URL = (
     "https://www.idealista.com/es/locationsSuggest/sale/home?searchField="
 )
+REQUESTS_PER_SECOND = 0.3
+RATE_LIMIT_JITTER = 0.5
+MAX_CONCURRENT_REQUESTS = 3
+LOCATION_WORKERS = 1
+PROPERTIES_PER_PAGE = 30
+PROGRESS_REPORT_INTERVAL = 60
+LINK_QUEUE_SIZE = 2 * PROPERTIES_PER_PAGE
+WRITE_BATCH_SIZE = PROPERTIES_PER_PAGE
+WRITE_FLUSH_INTERVAL = 5
+LISTING_INDEX_PATH = "data/listing_index.sqlite"
+RESPONSE_CACHE_DIR = "data/response_cache"
+RESPONSE_CACHE_MAX_BYTES = 2 * 1024**3
+METRICS_DUMP_INTERVAL = 15
+# One core stays with the event loop; single-core hosts parse inline.
+PARSE_WORKERS = max(0, (os.cpu_count() or 1) - 1)
+ANALYTICS_DIR = "data/analytics"
+DASHBOARD_CACHE_TTL = 600
+LOCATION_PREFIX_ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+# Longest locationsSuggest prefix tried when suggestions keep being cut off.
+LOCATION_MAX_PREFIX_LENGTH = 3
+CHECKPOINT_PATH = "data/crawl_checkpoint.sqlite"
+CHECKPOINT_FLUSH_INTERVAL = 5
+WORK_QUEUE_PATH = "data/work_queue.sqlite"
+WORK_LEASE_SECONDS = 300
+WORK_HEARTBEAT_INTERVAL = 60
+WORK_MAX_ATTEMPTS = 3
+COMPARABLES_K = 10
+MIN_COMPARABLES = 5
+# Alert when a listing is priced this fraction below its estimated value.
+ALERT_DISCOUNT = 0.2
+ALERTS_PATH = "data/alerts.jsonl"
+PRICE_HISTORY_DIR = "data/price_history"
+FETCH_MAX_RETRIES = 4
+# Exponential backoff between retries of a blocked or failed request.
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 120.0
+# Consecutive blocks of a host that pause its crawl, and for how long.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 60.0
+BREAKER_MAX_COOLDOWN_SECONDS = 900.0
+# AIMD: halve a host's rate when blocked, then add back this fraction of
+# the configured rate per successful request.
+RATE_DECREASE_FACTOR = 0.5
+RATE_INCREASE_FRACTION = 0.05
+MIN_REQUESTS_PER_SECOND = 0.02
+# Every session of the pool impersonates the next of these browsers.
+SESSION_PROFILES = ("chrome131", "chrome124", "safari17_0", "edge101")
+SESSION_POOL_SIZE = 3
+# Fraction of the messages of each high-volume kind that gets logged.
+LOG_SAMPLE_RATES = {"request": 0.1, "page": 0.2, "batch": 0.2, "batch_saved": 0.2}
+NEAR_MATCH_TOLERANCE = 0.05
+# MinHash permutations, split into LSH bands of equal width.
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Listings whose estimated Jaccard similarity reaches this are duplicates.
+DUPLICATE_THRESHOLD = 0.5
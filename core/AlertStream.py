@@ -0,0 +1,41 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Callable
+
+from constants.constants import ALERTS_PATH
+from core.Logger import Logger
+
+
+class AlertStream:
+    """
+    Alerts for listings priced below their estimated market value.
+
+    Every alert is logged, appended as a JSON line to `path` and passed to
+    the subscribed callbacks, e.g. to push a notification.
+    """
+
+    def __init__(self, logger: Logger, path: str | None = ALERTS_PATH):
+        self.logger = logger
+        self.path = path
+        self.subscribers: list[Callable[[dict], None]] = []
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        self.subscribers.append(callback)
+
+    def emit(self, alert: dict) -> None:
+        alert = {"created_at": datetime.now(timezone.utc).isoformat(), **alert}
+        self.logger.info(
+            f"🚨 {alert['url']} is {alert['discount']:.0%} below its estimated "
+            f"value ({alert['price']:,.0f} € vs {alert['estimated_value']:,.0f} €)"
+        )
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(alert, ensure_ascii=False) + "\n")
+        for callback in self.subscribers:
+            try:
+                callback(alert)
+            except Exception as e:
+                self.logger.error(f"❌ Alert subscriber failed: {e}")
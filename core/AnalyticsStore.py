@@ -0,0 +1,111 @@
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from constants.constants import ANALYTICS_DIR
+from core.Logger import Logger
+
+SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("price_amount", pa.float64()),
+        ("price_currency", pa.string()),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("square_meters", pa.int64()),
+        ("rooms", pa.int64()),
+        ("bathrooms", pa.int64()),
+        ("has_garage", pa.bool_()),
+        ("has_garden", pa.bool_()),
+        ("has_pool", pa.bool_()),
+        ("has_terrace", pa.bool_()),
+        ("is_new_development", pa.bool_()),
+        ("needs_renovation", pa.bool_()),
+        ("is_in_good_condition", pa.bool_()),
+        ("is_illegally_occupied", pa.bool_()),
+        ("is_partial", pa.bool_()),
+        ("agency_name", pa.string()),
+        ("url", pa.string()),
+    ]
+)
+PARTITION_SCHEMA = pa.schema(
+    [("location_id", pa.string()), ("scrape_date", pa.string())]
+)
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+SNAPSHOT_SCHEMA = pa.unify_schemas([SCHEMA, PARTITION_SCHEMA])
+
+
+class AnalyticsStore:
+    """
+    Local columnar mirror of the scraped properties.
+
+    Rows are buffered per (location_id, scrape_date) and written as Parquet
+    files under `location_id=<id>/scrape_date=<YYYY-MM-DD>/`, so reading a
+    location or a date range only opens the matching directories. Columns
+    missing from a row (partial properties) are stored as nulls.
+    """
+
+    def __init__(self, logger: Logger, directory: str = ANALYTICS_DIR):
+        self.logger = logger
+        self.directory = directory
+        self._buffers: dict[tuple[str, str], list[dict]] = defaultdict(list)
+
+    def append(self, rows: list[dict], scrape_date: str | None = None) -> None:
+        scrape_date = scrape_date or datetime.now(timezone.utc).date().isoformat()
+        for row in rows:
+            self._buffers[(str(row["location_id"]), scrape_date)].append(row)
+
+    def flush(self) -> None:
+        for (location_id, scrape_date), rows in self._buffers.items():
+            partition = os.path.join(
+                self.directory,
+                f"location_id={location_id}",
+                f"scrape_date={scrape_date}",
+            )
+            os.makedirs(partition, exist_ok=True)
+            pq.write_table(
+                pa.Table.from_pylist(rows, schema=SCHEMA),
+                # Files load in name order, which keeps them in append order.
+                os.path.join(
+                    partition, f"part-{time.time_ns()}-{uuid.uuid4().hex}.parquet"
+                ),
+            )
+            self.logger.debug(f"🗃️ Mirrored {len(rows)} properties to {partition}")
+        self._buffers.clear()
+
+    def load(
+        self,
+        columns: list[str] | None = None,
+        location_ids: list[str] | None = None,
+        since: str | None = None,
+    ) -> pa.Table:
+        """
+        Reads the snapshot, pruning partitions by location and scrape date.
+        The partition columns `location_id` and `scrape_date` are included.
+        """
+        if not os.path.isdir(self.directory):
+            empty = SNAPSHOT_SCHEMA.empty_table()
+            return empty.select(columns) if columns else empty
+
+        # Files written before a column was added read it as nulls.
+        dataset = ds.dataset(
+            self.directory,
+            schema=SNAPSHOT_SCHEMA,
+            format="parquet",
+            partitioning=PARTITIONING,
+        )
+        filters = []
+        if location_ids is not None:
+            filters.append(ds.field("location_id").isin(location_ids))
+        if since is not None:
+            filters.append(ds.field("scrape_date") >= since)
+        expression = None
+        for condition in filters:
+            expression = condition if expression is None else expression & condition
+        return dataset.to_table(columns=columns, filter=expression)
@@ -0,0 +1,180 @@
+import heapq
+import math
+import statistics
+from collections import defaultdict
+from typing import NamedTuple
+
+import pyarrow as pa
+
+from constants.constants import COMPARABLES_K, MIN_COMPARABLES
+
+# Cells are 15% wide in surface, so neighbouring cells hold similar sizes.
+AREA_BIN = math.log(1.15)
+MAX_ROOMS_BUCKET = 6
+MAX_RING = 4
+CONDITION_FLAGS = (
+    "is_new_development",
+    "needs_renovation",
+    "is_in_good_condition",
+    "is_illegally_occupied",
+)
+# Distance weights: a 15% surface difference counts as much as one room.
+AREA_WEIGHT = 1 / AREA_BIN
+ROOMS_WEIGHT = 1.0
+BATHROOMS_WEIGHT = 0.5
+FLAG_WEIGHTS = (0.5, 0.5, 0.5, 2.0)
+COLUMNS = (
+    "id",
+    "location_id",
+    "price_amount",
+    "square_meters",
+    "rooms",
+    "bathrooms",
+    *CONDITION_FLAGS,
+    "is_partial",
+)
+
+
+class Comparable(NamedTuple):
+    id: str
+    log_area: float
+    rooms: int
+    bathrooms: int
+    flags: tuple[bool, ...]
+    price_per_square_meter: float
+
+
+class ComparablesIndex:
+    """
+    In-memory index of stored properties for comparable-listings queries.
+
+    Properties are bucketed in a grid by (location, rooms, log surface).
+    A query ranks the listings of its own cell by a weighted distance over
+    surface, rooms, bathrooms and condition flags, and walks rings of
+    neighbouring cells only until no unvisited cell can hold anything
+    closer than its k-th best (or MAX_RING is reached), so its cost
+    depends on the density around the listing and not on the size of the
+    index. The estimated
+    value is the median €/m² of the k nearest comparables times the
+    surface.
+    """
+
+    def __init__(self, k: int = COMPARABLES_K, min_comparables: int = MIN_COMPARABLES):
+        self.k = k
+        self.min_comparables = min_comparables
+        self._cells: dict[tuple, dict[str, Comparable]] = defaultdict(dict)
+        self._cell_of: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def add(self, row: dict) -> None:
+        """Adds or moves a complete property row; unusable rows are ignored."""
+        entry = self._entry(row)
+        if entry is None:
+            return
+        cell = self._cell(row["location_id"], entry)
+        previous = self._cell_of.get(entry.id)
+        if previous is not None and previous != cell:
+            del self._cells[previous][entry.id]
+        self._cells[cell][entry.id] = entry
+        self._cell_of[entry.id] = cell
+
+    def add_table(self, table: pa.Table) -> None:
+        columns = [table.column(name).to_pylist() for name in COLUMNS]
+        for values in zip(*columns):
+            self.add(dict(zip(COLUMNS, values)))
+
+    def estimate(self, row: dict) -> dict | None:
+        """
+        Estimates the market value of a row from its nearest comparables,
+        or returns None when it can't be scored or there are too few.
+        """
+        target = self._entry(row)
+        if target is None:
+            return None
+        comparables = self.nearest(row["location_id"], target)
+        if len(comparables) < self.min_comparables:
+            return None
+        price_per_square_meter = statistics.median(
+            comparable.price_per_square_meter for comparable in comparables
+        )
+        estimated_value = price_per_square_meter * row["square_meters"]
+        if estimated_value <= 0:
+            return None
+        return {
+            "estimated_value": estimated_value,
+            "discount": 1 - row["price_amount"] / estimated_value,
+            "comparables": [comparable.id for comparable in comparables],
+        }
+
+    def nearest(self, location_id: str, target: Comparable) -> list[Comparable]:
+        _, rooms, area_bin = self._cell(location_id, target)
+        candidates: list[tuple[float, str, Comparable]] = []
+        for ring in range(MAX_RING + 1):
+            for cell in self._ring(location_id, rooms, area_bin, ring):
+                candidates.extend(
+                    (_distance(target, entry), entry.id, entry)
+                    for entry in self._cells.get(cell, {}).values()
+                    if entry.id != target.id
+                )
+            if len(candidates) < self.k:
+                continue
+            # Entries of the next ring are at least `ring` away (one room
+            # or one surface cell per step, minus the width of the own
+            # cell), so once the k-th best is that close the search is done.
+            nearest = heapq.nsmallest(self.k, candidates)
+            if nearest[-1][0] <= ring:
+                break
+        else:
+            nearest = heapq.nsmallest(self.k, candidates)
+        return [entry for _, _, entry in nearest]
+
+    @staticmethod
+    def _ring(location_id: str, rooms: int, area_bin: int, ring: int):
+        """Cells at Manhattan distance `ring` from (rooms, area_bin)."""
+        for rooms_offset in range(-ring, ring + 1):
+            neighbour_rooms = rooms + rooms_offset
+            if not 0 <= neighbour_rooms <= MAX_ROOMS_BUCKET:
+                continue
+            area_offset = ring - abs(rooms_offset)
+            for neighbour_bin in {area_bin - area_offset, area_bin + area_offset}:
+                yield (location_id, neighbour_rooms, neighbour_bin)
+
+    @staticmethod
+    def _cell(location_id: str, entry: Comparable) -> tuple:
+        return (
+            location_id,
+            min(entry.rooms, MAX_ROOMS_BUCKET),
+            math.floor(entry.log_area / AREA_BIN),
+        )
+
+    @staticmethod
+    def _entry(row: dict) -> Comparable | None:
+        if row.get("is_partial") or row.get("location_id") is None:
+            return None
+        # "Precio a consultar" listings and typos would skew the medians.
+        if not row.get("square_meters") or row["square_meters"] <= 0:
+            return None
+        if row.get("price_amount") is None or row["price_amount"] <= 0:
+            return None
+        return Comparable(
+            id=row["id"],
+            log_area=math.log(row["square_meters"]),
+            rooms=row.get("rooms") or 0,
+            bathrooms=row.get("bathrooms") or 0,
+            flags=tuple(bool(row.get(flag)) for flag in CONDITION_FLAGS),
+            price_per_square_meter=row["price_amount"] / row["square_meters"],
+        )
+
+
+def _distance(target: Comparable, entry: Comparable) -> float:
+    distance = (
+        AREA_WEIGHT * abs(target.log_area - entry.log_area)
+        + ROOMS_WEIGHT * abs(target.rooms - entry.rooms)
+        + BATHROOMS_WEIGHT * abs(target.bathrooms - entry.bathrooms)
+    )
+    for weight, a, b in zip(FLAG_WEIGHTS, target.flags, entry.flags):
+        if a != b:
+            distance += weight
+    return distance
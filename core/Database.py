@@ -4,10 +4,13 @@ from dotenv import load_dotenv
 from supabase import Client, create_client
 
 from core.Logger import Logger
+from core.models.PropertyRecord import CARD_UPDATE_COLUMNS
 
 
 class Database:
-    def __init__(self, logger: Logger):
+    DEFAULT_BATCH_SIZE = 500
+
+    def __init__(self, logger: Logger, batch_size: int = DEFAULT_BATCH_SIZE):
         load_dotenv()
         self.url = os.getenv("SUPABASE_URL")
         self.key = os.getenv("SUPABASE_KEY")
@@ -17,55 +20,132 @@ class Database:
                 "SUPABASE_URL and SUPABASE_KEY must be set up as env variables"
             )
         self.logger = logger
+        self.batch_size = batch_size
         self.client: Client = create_client(self.url, self.key)
 
-    def insert_locations(self, locations: list[dict]) -> bool:
-        response = self.client.table("Locations").select("*").execute()
-        self.logger.debug(f"supabase connection was succeded: {response}")
-        try:
-            response = self.client.table("Locations").insert(locations).execute()
-            if response.data is None:
-                self.logger.error(f"Supabase insert failed: {response}")
-                return False
-            return len(response.data) > 0
-        except Exception as e:
-            self.logger.error(f"Error inserting locations: {str(e)}")
-            return False
+    def insert_locations(
+        self, locations: list[dict], batch_size: int | None = None
+    ) -> bool:
+        written, failure_count = self._upsert_in_batches(
+            "Locations", locations, batch_size or self.batch_size
+        )
+        self.logger.info(
+            f"Locations upsert complete. Success: {len(written)}, Failures: {failure_count}"
+        )
+        return len(written) > 0
 
-    def insert_properties(self, properties: list[dict]) -> bool:
+    def insert_properties(
+        self, properties: list[dict], batch_size: int | None = None
+    ) -> set[str]:
         """
-        Inserta una lista de propiedades en la base de datos.
-        Si una propiedad falla, continúa con las siguientes.
+        Inserta o actualiza una lista de propiedades en la base de datos,
+        en lotes de `batch_size` filas y usando el `id` como clave.
+        Si un lote falla se divide a la mitad y se reintenta, de forma que
+        una propiedad inválida no impide guardar las demás.
 
         Args:
             properties: Lista de diccionarios con los datos de las propiedades
+            batch_size: Número máximo de filas por petición
 
         Returns:
-            bool: True si al menos una propiedad se insertó correctamente
+            set[str]: Los `id` de las propiedades guardadas correctamente
         """
-        success_count = 0
-        failure_count = 0
+        written, failure_count = self._upsert_in_batches(
+            "Properties", properties, batch_size or self.batch_size
+        )
+        self.logger.info(
+            f"Properties insertion complete. Success: {len(written)}, Failures: {failure_count}"
+        )
+        return {row["id"] for row in written}
 
-        for property in properties:
-            try:
-                response = self.client.table("Properties").insert(property).execute()
-                if response.data is not None:
-                    success_count += 1
-                else:
-                    failure_count += 1
-                    self.logger.error(
-                        f"Database insert failed for property {property.get('id', 'unknown')}: {response}"
-                    )
-            except Exception as e:
-                failure_count += 1
-                self.logger.error(
-                    f"Error inserting property {property.get('id', 'unknown')}: {str(e)}"
-                )
+    def insert_partial_properties(
+        self, properties: list[dict], batch_size: int | None = None
+    ) -> set[str]:
+        """
+        Guarda las filas parciales de las tarjetas de resultados sin pisar
+        las propiedades ya guardadas con sus detalles: las nuevas se
+        insertan completas y de las existentes solo se actualizan el precio,
+        los metros y las habitaciones (CARD_UPDATE_COLUMNS).
 
+        Returns:
+            set[str]: Los `id` de las propiedades guardadas correctamente
+        """
+        batch_size = batch_size or self.batch_size
+        inserted, insert_failures = self._upsert_in_batches(
+            "Properties", properties, batch_size, ignore_duplicates=True
+        )
+        updated, update_failures = self._upsert_in_batches(
+            "Properties",
+            [
+                {column: row[column] for column in CARD_UPDATE_COLUMNS}
+                for row in inserted
+            ],
+            batch_size,
+        )
         self.logger.info(
-            f"Properties insertion complete. Success: {success_count}, Failures: {failure_count}"
+            f"Partial properties insertion complete. Success: {len(updated)},"
+            f" Failures: {insert_failures + update_failures}"
         )
-        return success_count > 0
+        return {row["id"] for row in updated}
+
+    def upsert_location_stats(self, stats: list[dict]) -> bool:
+        written, failure_count = self._upsert_in_batches(
+            "LocationStats", stats, self.batch_size, on_conflict="location_id"
+        )
+        self.logger.info(
+            f"Location stats upsert complete. Success: {len(written)}, Failures: {failure_count}"
+        )
+        return len(written) > 0
+
+    def _upsert_in_batches(
+        self,
+        table: str,
+        rows: list[dict],
+        batch_size: int,
+        on_conflict: str = "id",
+        ignore_duplicates: bool = False,
+    ) -> tuple[list[dict], int]:
+        written: list[dict] = []
+        failure_count = 0
+        for start in range(0, len(rows), batch_size):
+            succeeded, failed = self._upsert_batch(
+                table, rows[start : start + batch_size], on_conflict, ignore_duplicates
+            )
+            written += succeeded
+            failure_count += failed
+        return written, failure_count
+
+    def _upsert_batch(
+        self,
+        table: str,
+        rows: list[dict],
+        on_conflict: str = "id",
+        ignore_duplicates: bool = False,
+    ) -> tuple[list[dict], int]:
+        try:
+            response = (
+                self.client.table(table)
+                .upsert(
+                    rows, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates
+                )
+                .execute()
+            )
+            if response.data is not None:
+                return rows, 0
+            error = response
+        except Exception as e:
+            error = e
+
+        if len(rows) == 1:
+            self.logger.error(
+                f"Error upserting {table} row {rows[0].get('id', 'unknown')}: {str(error)}"
+            )
+            return [], 1
+
+        middle = len(rows) // 2
+        left = self._upsert_batch(table, rows[:middle], on_conflict, ignore_duplicates)
+        right = self._upsert_batch(table, rows[middle:], on_conflict, ignore_duplicates)
+        return left[0] + right[0], left[1] + right[1]
 
     def get_locations(self) -> list[dict]:
         try:
@@ -82,3 +162,69 @@ class Database:
         except Exception as e:
             self.logger.error(f"Error getting locations: {str(e)}")
             return []
+
+    def get_location_ids(self, page_size: int = 1000) -> list[dict] | None:
+        """
+        Devuelve el id, la ruta y la fecha de creación de todas las
+        ubicaciones, paginando para no quedarse en el límite de filas de
+        Supabase. Devuelve None si la lectura falla, para no confundir un
+        error con una tabla vacía.
+        """
+        locations: list[dict] = []
+        try:
+            while True:
+                response = (
+                    self.client.table("Locations")
+                    .select("id, path, created_at")
+                    .order("id")
+                    .range(len(locations), len(locations) + page_size - 1)
+                    .execute()
+                )
+                locations.extend(response.data or [])
+                if len(response.data or []) < page_size:
+                    return locations
+        except Exception as e:
+            self.logger.error(f"Error getting location ids: {str(e)}")
+            return None
+
+    def get_location_summaries(self) -> list[dict]:
+        """
+        Devuelve solo las columnas necesarias para listar las ubicaciones,
+        ordenadas por número de propiedades.
+        """
+        try:
+            response = (
+                self.client.table("Locations")
+                .select("id, title, path, number_of_properties")
+                .order("number_of_properties", desc=True)
+                .execute()
+            )
+            if response.data is None:
+                self.logger.error(f"Supabase get failed: {response}")
+                return []
+            return response.data
+        except Exception as e:
+            self.logger.error(f"Error getting location summaries: {str(e)}")
+            return []
+
+    def get_location_stats(self, location_id: str) -> dict | None:
+        """
+        Lee las estadísticas precalculadas de una ubicación por su clave
+        primaria, sin recorrer la tabla de propiedades.
+        """
+        try:
+            response = (
+                self.client.table("LocationStats")
+                .select("*")
+                .eq("location_id", location_id)
+                .limit(1)
+                .execute()
+            )
+            if not response.data:
+                return None
+            return response.data[0]
+        except Exception as e:
+            self.logger.error(
+                f"Error getting stats of location {location_id}: {str(e)}"
+            )
+            return None
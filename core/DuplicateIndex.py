@@ -0,0 +1,209 @@
+import math
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import pyarrow as pa
+
+from constants.constants import DUPLICATE_THRESHOLD, LSH_BANDS, MINHASH_PERMUTATIONS
+
+SHINGLE_SIZE = 3
+WORD_REGEX = re.compile(r"\w+")
+# Prices within ~5% of each other share a token.
+PRICE_BIN = math.log(1.05)
+# Duplicates must also agree on these, however alike their texts are:
+# agencies reuse boilerplate descriptions for different flats.
+SURFACE_TOLERANCE = 0.1
+PRICE_TOLERANCE = 0.15
+SEED = 13
+COLUMNS = (
+    "id",
+    "location_id",
+    "title",
+    "description",
+    "price_amount",
+    "square_meters",
+    "rooms",
+    "bathrooms",
+    "is_partial",
+)
+
+
+class DuplicateIndex:
+    """
+    Incremental near-duplicate detection of listings with MinHash and LSH.
+
+    A listing is the set of 3-word shingles of its title and description
+    plus tokens for its surface, rooms, bathrooms and price bin, so the same
+    flat reworded by another agency shares most of its set. Its MinHash
+    signature estimates the Jaccard similarity of two sets as the share of
+    equal positions. The signature is cut into bands, and listings of the
+    same location sharing a whole band land in the same bucket: only those
+    candidates are compared, so adding a listing costs about the same
+    whatever the size of the index. Candidates at or above `threshold` are
+    merged into clusters with a union-find, provided they also have the
+    same rooms and a surface and price within SURFACE_TOLERANCE and
+    PRICE_TOLERANCE; the first listing seen in a cluster is its canonical
+    one.
+    """
+
+    def __init__(
+        self,
+        permutations: int = MINHASH_PERMUTATIONS,
+        bands: int = LSH_BANDS,
+        threshold: float = DUPLICATE_THRESHOLD,
+    ):
+        if permutations % bands:
+            raise ValueError("permutations must be a multiple of bands")
+        self.bands = bands
+        self.rows = permutations // bands
+        self.threshold = threshold
+        generator = np.random.default_rng(SEED)
+        # Multiply-shift hashing: (a * x + b) mod 2^64, top 32 bits.
+        self._a = generator.integers(1, 2**63, permutations, dtype=np.uint64) | 1
+        self._b = generator.integers(0, 2**63, permutations, dtype=np.uint64)
+        self._signatures: dict[str, np.ndarray] = {}
+        self._layouts: dict[str, tuple] = {}
+        self._buckets: dict[tuple, list[str]] = defaultdict(list)
+        self._parent: dict[str, str] = {}
+        self._order: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def add_table(self, table: pa.Table) -> None:
+        """Indexes the complete rows of a snapshot, skipping partial ones."""
+        columns = [table.column(name).to_pylist() for name in COLUMNS]
+        for values in zip(*columns):
+            row = dict(zip(COLUMNS, values))
+            if not row["is_partial"]:
+                self.add(row)
+
+    def add(self, row: dict) -> list[str]:
+        """
+        Indexes a complete property row and returns the already indexed
+        listings it duplicates. Rows seen before are left as they are.
+        """
+        listing_id = row["id"]
+        if listing_id in self._signatures:
+            return []
+        tokens = self._tokens(row)
+        if not tokens:
+            return []
+        signature = self.signature(tokens)
+        candidates = set()
+        keys = [
+            (
+                band,
+                row.get("location_id"),
+                signature[start : start + self.rows].tobytes(),
+            )
+            for band, start in enumerate(range(0, len(signature), self.rows))
+        ]
+        for key in keys:
+            candidates.update(self._buckets[key])
+
+        self._signatures[listing_id] = signature
+        self._layouts[listing_id] = layout = (
+            row.get("rooms"),
+            row.get("square_meters"),
+            row.get("price_amount"),
+        )
+        self._parent[listing_id] = listing_id
+        self._order[listing_id] = len(self._order)
+        for key in keys:
+            self._buckets[key].append(listing_id)
+
+        duplicates = [
+            candidate
+            for candidate in candidates
+            if _same_layout(self._layouts[candidate], layout)
+            and np.mean(self._signatures[candidate] == signature) >= self.threshold
+        ]
+        for duplicate in duplicates:
+            self._union(listing_id, duplicate)
+        return duplicates
+
+    def signature(self, tokens: set[str]) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) for token in tokens),
+            dtype=np.uint64,
+            count=len(tokens),
+        )
+        permuted = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def canonical(self, listing_id: str) -> str:
+        """The listing standing for the cluster of `listing_id`."""
+        return self._find(listing_id) if listing_id in self._parent else listing_id
+
+    def clusters(self) -> list[list[str]]:
+        """Every group of two or more duplicate listings, canonical first."""
+        groups: dict[str, list[str]] = defaultdict(list)
+        for listing_id in self._parent:
+            groups[self._find(listing_id)].append(listing_id)
+        return [
+            sorted(members, key=self._order.__getitem__)
+            for members in groups.values()
+            if len(members) > 1
+        ]
+
+    def duplicate_ids(self) -> set[str]:
+        """Listings that are not the canonical one of their cluster."""
+        return {
+            listing_id
+            for listing_id in self._parent
+            if self._find(listing_id) != listing_id
+        }
+
+    def _tokens(self, row: dict) -> set[str]:
+        words = WORD_REGEX.findall(
+            f"{row.get('title') or ''} {row.get('description') or ''}".lower()
+        )
+        tokens = {
+            " ".join(words[start : start + SHINGLE_SIZE])
+            for start in range(max(1, len(words) - SHINGLE_SIZE + 1))
+            if words
+        }
+        for column in ("square_meters", "rooms", "bathrooms"):
+            if row.get(column):
+                tokens.add(f"{column}:{row[column]}")
+        if row.get("price_amount"):
+            tokens.add(f"price:{round(math.log(row['price_amount']) / PRICE_BIN)}")
+        return tokens
+
+    def _find(self, listing_id: str) -> str:
+        root = listing_id
+        while self._parent[root] != root:
+            root = self._parent[root]
+        # Path compression: point every listing on the way at the root.
+        while self._parent[listing_id] != root:
+            self._parent[listing_id], listing_id = root, self._parent[listing_id]
+        return root
+
+    def _union(self, first: str, second: str) -> None:
+        first, second = self._find(first), self._find(second)
+        if first == second:
+            return
+        # The listing seen first stays the canonical one.
+        if self._order[second] < self._order[first]:
+            first, second = second, first
+        self._parent[second] = first
+
+
+def _same_layout(first: tuple, second: tuple) -> bool:
+    """Same rooms, similar surface and price, when both listings give them."""
+    first_rooms, first_surface, first_price = first
+    second_rooms, second_surface, second_price = second
+    if first_rooms and second_rooms and first_rooms != second_rooms:
+        return False
+    return _close(first_surface, second_surface, SURFACE_TOLERANCE) and _close(
+        first_price, second_price, PRICE_TOLERANCE
+    )
+
+
+def _close(first: float | None, second: float | None, tolerance: float) -> bool:
+    if not first or not second:
+        return True
+    return abs(first - second) <= tolerance * max(first, second)
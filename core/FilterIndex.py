@@ -0,0 +1,282 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pyarrow as pa
+
+from constants.constants import NEAR_MATCH_TOLERANCE
+from core.models.PropertyRecord import CARD_UPDATE_COLUMNS
+
+RANGE_COLUMNS = ("price_amount", "square_meters", "rooms", "bathrooms")
+FLAG_COLUMNS = (
+    "has_garage",
+    "has_garden",
+    "has_pool",
+    "has_terrace",
+    "is_new_development",
+    "needs_renovation",
+    "is_in_good_condition",
+    "is_illegally_occupied",
+)
+COLUMNS = ("id", "location_id", *RANGE_COLUMNS, *FLAG_COLUMNS)
+# Columns a partial row (a result card) knows nothing about.
+DETAIL_COLUMNS = tuple(
+    column
+    for column in (*RANGE_COLUMNS, *FLAG_COLUMNS)
+    if column not in CARD_UPDATE_COLUMNS
+)
+SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("location_id", pa.string()),
+        *((column, pa.float64()) for column in RANGE_COLUMNS),
+        *((column, pa.bool_()) for column in FLAG_COLUMNS),
+    ]
+)
+# Rows added since the last sort are scanned; past this share of the
+# indexed rows everything is sorted again.
+UNSORTED_SHARE = 0.125
+MIN_UNSORTED_ROWS = 10_000
+
+
+@dataclass
+class FilterCounts:
+    """Per-location counts of the listings matching a filter."""
+
+    location_ids: np.ndarray
+    matching: np.ndarray
+    # Listings only matching once every range is widened by the tolerance.
+    near_matching: np.ndarray
+
+    def to_dicts(self) -> list[dict]:
+        return [
+            {
+                "location_id": location_id,
+                "matching": int(matching),
+                "near_matching": int(near_matching),
+            }
+            for location_id, matching, near_matching in zip(
+                self.location_ids, self.matching, self.near_matching
+            )
+            if matching or near_matching
+        ]
+
+    def for_location(self, location_id: str) -> tuple[int, int]:
+        positions = np.flatnonzero(self.location_ids == location_id)
+        if len(positions) == 0:
+            return 0, 0
+        return int(self.matching[positions[0]]), int(self.near_matching[positions[0]])
+
+
+class FilterIndex:
+    """
+    In-memory index answering range and flag filters over the listings.
+
+    Every range column keeps the argsort of its values, so the rows within
+    a range are a slice found with two binary searches. A query starts from
+    the narrowest slice and checks the other ranges on those rows only. The
+    flags are bitsets (np.packbits), tested bit by bit for the candidates.
+
+    Rows can be added at any time: a listing added again replaces its
+    previous row, which is only marked dead. New rows are scanned until
+    they outgrow UNSORTED_SHARE of the sorted ones, then everything is
+    sorted again and the dead rows dropped.
+    """
+
+    def __init__(self):
+        self._positions: dict[str, int] = {}
+        self._location_codes: dict[str, int] = {}
+        self._location_ids: list[str] = []
+        self._values = {column: np.empty(0) for column in RANGE_COLUMNS}
+        self._flags = {column: np.empty(0, dtype=bool) for column in FLAG_COLUMNS}
+        self._locations = np.empty(0, dtype=np.intp)
+        self._alive = np.empty(0, dtype=bool)
+        self._ids = np.empty(0, dtype=object)
+        # Rows [0, _sorted_rows) are covered by the orders and bitsets.
+        self._sorted_rows = 0
+        self._orders: dict[str, np.ndarray] = {}
+        self._sorted_values: dict[str, np.ndarray] = {}
+        self._bitsets: dict[str, np.ndarray] = {}
+        self._sort()
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add_table(self, table: pa.Table) -> None:
+        """
+        Adds the rows of a table with (at least) the COLUMNS columns. With an
+        `is_partial` column, a partial row of an indexed listing keeps the
+        DETAIL_COLUMNS of its previous row.
+        """
+        if table.num_rows == 0:
+            return
+        ids = table.column("id").to_pylist()
+        offsets, previous = self._merged_rows(table, ids)
+        start = len(self._ids)
+        codes = [
+            self._location_code(location_id)
+            for location_id in table.column("location_id").to_pylist()
+        ]
+        self._locations = np.concatenate((self._locations, codes)).astype(np.intp)
+        self._ids = np.concatenate((self._ids, np.asarray(ids, dtype=object)))
+        self._alive = np.concatenate((self._alive, np.ones(len(ids), dtype=bool)))
+        for column in RANGE_COLUMNS:
+            values = table.column(column).to_numpy(zero_copy_only=False)
+            # Missing values become NaN, which no range matches.
+            values = np.array(values, dtype=np.float64)
+            if column in DETAIL_COLUMNS:
+                values[offsets] = self._values[column][previous]
+            self._values[column] = np.concatenate((self._values[column], values))
+        for column in FLAG_COLUMNS:
+            flags = table.column(column).fill_null(False).to_numpy(zero_copy_only=False)
+            flags = np.array(flags, dtype=bool)
+            flags[offsets] = self._flags[column][previous]
+            self._flags[column] = np.concatenate((self._flags[column], flags))
+        for offset, listing_id in enumerate(ids):
+            previous = self._positions.get(listing_id)
+            if previous is not None:
+                self._alive[previous] = False
+            self._positions[listing_id] = start + offset
+
+        unsorted = len(self._ids) - self._sorted_rows
+        if unsorted > max(MIN_UNSORTED_ROWS, self._sorted_rows * UNSORTED_SHARE):
+            self._sort()
+
+    def _merged_rows(
+        self, table: pa.Table, ids: list[str]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Offsets of the partial rows of indexed listings, and their rows."""
+        if "is_partial" not in table.column_names:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        partial = table.column("is_partial").to_pylist()
+        merged = [
+            (offset, self._positions[listing_id])
+            for offset, listing_id in enumerate(ids)
+            if partial[offset] and listing_id in self._positions
+        ]
+        offsets, previous = zip(*merged) if merged else ((), ())
+        return np.asarray(offsets, dtype=np.intp), np.asarray(previous, dtype=np.intp)
+
+    def add_rows(self, rows: list[dict]) -> None:
+        self.add_table(
+            pa.Table.from_pylist(
+                [{column: row.get(column) for column in COLUMNS} for row in rows],
+                schema=SCHEMA,
+            )
+        )
+
+    def count(
+        self,
+        ranges: dict[str, tuple[float | None, float | None]] | None = None,
+        flags: dict[str, bool] | None = None,
+        tolerance: float = NEAR_MATCH_TOLERANCE,
+    ) -> FilterCounts:
+        """
+        Counts per location the listings within every (min, max) range, None
+        meaning unbounded, and with every flag set as given. Near matches
+        are the listings only within the ranges widened by `tolerance`.
+        """
+        ranges = {
+            column: bounds
+            for column, bounds in (ranges or {}).items()
+            if bounds != (None, None)
+        }
+        flags = flags or {}
+        size = len(self._location_ids)
+        matching = np.bincount(
+            self._locations[self._match(ranges, flags)], minlength=size
+        )
+        widened = {
+            column: (
+                None if low is None else low * (1 - tolerance),
+                None if high is None else high * (1 + tolerance),
+            )
+            for column, (low, high) in ranges.items()
+        }
+        near = np.bincount(self._locations[self._match(widened, flags)], minlength=size)
+        return FilterCounts(
+            location_ids=np.asarray(self._location_ids, dtype=object),
+            matching=matching,
+            near_matching=near - matching,
+        )
+
+    def _match(self, ranges: dict, flags: dict[str, bool]) -> np.ndarray:
+        """Positions of the live rows matching the ranges and flags."""
+        candidates = self._sorted_candidates(ranges)
+        if candidates is None:
+            # Flags only: combine the bitsets whole, eight rows per byte.
+            bitset = np.packbits(self._alive[: self._sorted_rows])
+            for column, wanted in flags.items():
+                bitset &= self._bitsets[column] if wanted else ~self._bitsets[column]
+            candidates = np.flatnonzero(np.unpackbits(bitset, count=self._sorted_rows))
+            keep = np.ones(len(candidates), dtype=bool)
+        else:
+            keep = self._alive[candidates]
+            for column, (low, high) in ranges.items():
+                keep &= _within(self._values[column][candidates], low, high)
+            for column, wanted in flags.items():
+                keep &= _bits(self._bitsets[column], candidates) == wanted
+
+        tail = np.arange(self._sorted_rows, len(self._ids))
+        tail_keep = self._alive[tail]
+        for column, (low, high) in ranges.items():
+            tail_keep &= _within(self._values[column][tail], low, high)
+        for column, wanted in flags.items():
+            tail_keep &= self._flags[column][tail] == wanted
+        return np.concatenate((candidates[keep], tail[tail_keep]))
+
+    def _sorted_candidates(self, ranges: dict) -> np.ndarray | None:
+        """Rows of the narrowest range slice, or None without ranges."""
+        narrowest = None
+        for column, (low, high) in ranges.items():
+            values = self._sorted_values[column]
+            start = 0 if low is None else np.searchsorted(values, low, "left")
+            # NaNs sort last and must stay out of unbounded ranges too.
+            stop = (
+                np.searchsorted(values, np.inf, "right")
+                if high is None
+                else np.searchsorted(values, high, "right")
+            )
+            if narrowest is None or stop - start < narrowest[2] - narrowest[1]:
+                narrowest = (column, start, stop)
+        if narrowest is None:
+            return None
+        column, start, stop = narrowest
+        return self._orders[column][start:stop]
+
+    def _sort(self) -> None:
+        live = np.flatnonzero(self._alive)
+        if len(live) < len(self._ids):
+            self._ids = self._ids[live]
+            self._positions = {
+                listing_id: position for position, listing_id in enumerate(self._ids)
+            }
+        self._locations = self._locations[live]
+        self._alive = np.ones(len(live), dtype=bool)
+        for column in RANGE_COLUMNS:
+            values = self._values[column] = self._values[column][live]
+            self._orders[column] = np.argsort(values, kind="stable")
+            self._sorted_values[column] = values[self._orders[column]]
+        for column in FLAG_COLUMNS:
+            self._flags[column] = self._flags[column][live]
+            self._bitsets[column] = np.packbits(self._flags[column])
+        self._sorted_rows = len(live)
+
+    def _location_code(self, location_id: str) -> int:
+        code = self._location_codes.get(location_id)
+        if code is None:
+            code = self._location_codes[location_id] = len(self._location_ids)
+            self._location_ids.append(location_id)
+        return code
+
+
+def _within(values: np.ndarray, low: float | None, high: float | None) -> np.ndarray:
+    # NaN comparisons are False, so missing values never match a bound.
+    keep = values >= low if low is not None else ~np.isnan(values)
+    if high is not None:
+        keep &= values <= high
+    return keep
+
+
+def _bits(bitset: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    # np.packbits stores the first row in the most significant bit.
+    return ((bitset[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
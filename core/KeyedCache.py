@@ -0,0 +1,40 @@
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+
+class KeyedCache:
+    """
+    Thread-safe in-process cache of values by key.
+
+    Entries expire after `ttl` seconds and can be dropped one by one with
+    `invalidate`, so refreshing a location doesn't throw away the rest of
+    the cache. Loaders run outside the lock; two threads missing the same
+    key may both load it, the last one wins.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            expires_at, value = self._entries.get(key, (0.0, _MISSING))
+        if value is not _MISSING and expires_at > now:
+            return value
+        value = loader()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
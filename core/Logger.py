@@ -1,8 +1,39 @@
 from loguru import logger
 import sys
 
+from constants.constants import LOG_SAMPLE_RATES
+
+# Shared by every call: `opt` builds a new logger each time it is called.
+_log = logger.opt(depth=1)
+DEBUG, INFO, WARNING, ERROR = (
+    logger.level(name).no for name in ("DEBUG", "INFO", "WARNING", "ERROR")
+)
+# (level, message) of the records logged in a worker process.
+_captured: list[tuple[str, str]] = []
+
+
 class Logger:
-    def __init__(self, log_file: str = "app.log", level: str = "INFO"):
+    """
+    Wraps loguru with queued sinks, lazy formatting and sampling.
+
+    With `enqueue` the sinks are written from a background thread, so a
+    slow stdout or disk never stalls the event loop, although handing a
+    record over costs more CPU than writing it. Messages can be given as a
+    template and its arguments, `logger.debug("Fetched {}", url)`, which is
+    only formatted when the level is enabled; calls below the level return
+    before reaching loguru. Messages tagged with a `sample` kind listed in
+    `sample_rates` are only logged once every 1 / rate calls. `serialize`
+    writes one JSON object per line instead of text.
+    """
+
+    def __init__(
+        self,
+        log_file: str = "app.log",
+        level: str = "INFO",
+        enqueue: bool = False,
+        serialize: bool = False,
+        sample_rates: dict[str, float] = LOG_SAMPLE_RATES,
+    ):
         logger.remove()
         log_format = (
             "<cyan>{time:YYYY-MM-DD HH:mm:ss}</cyan> | "
@@ -10,20 +41,90 @@ class Logger:
             "<magenta>{module}:{function}:{line}</magenta> - "
             "<level>{message}</level>"
         )
-        logger.add(sys.stdout, level=level, colorize=True, format=log_format, backtrace=True, diagnose=True)
-        logger.add(log_file, level=level, format="{time} | {level} | {message}", rotation="500 MB", compression="zip")
+        # diagnose would render every local variable of a traceback.
+        logger.add(
+            sys.stdout,
+            level=level,
+            colorize=not serialize,
+            format=log_format,
+            serialize=serialize,
+            backtrace=True,
+            diagnose=False,
+            enqueue=enqueue,
+        )
+        logger.add(
+            log_file,
+            level=level,
+            format="{time} | {level} | {message}",
+            serialize=serialize,
+            rotation="500 MB",
+            compression="zip",
+            enqueue=enqueue,
+        )
+        self.level_no = logger.level(level).no
+        self._sample_every = {
+            kind: round(1 / rate) if rate > 0 else 0
+            for kind, rate in sample_rates.items()
+        }
+        self._sample_counts = dict.fromkeys(self._sample_every, 0)
+
+    def info(self, message: str, *args, sample: str | None = None):
+        if self.level_no <= INFO and self._keep(sample):
+            _log.info(message, *args)
+
+    def warning(self, message: str, *args, sample: str | None = None):
+        if self.level_no <= WARNING and self._keep(sample):
+            _log.warning(message, *args)
+
+    def error(self, message: str, *args, sample: str | None = None):
+        if self.level_no <= ERROR and self._keep(sample):
+            _log.error(message, *args)
+
+    def debug(self, message: str, *args, sample: str | None = None):
+        if self.level_no <= DEBUG and self._keep(sample):
+            _log.debug(message, *args)
+
+    def critical(self, message: str, *args):
+        _log.critical(message, *args)
+
+    def replay(self, records: list[tuple[str, str]]):
+        """Logs the (level, message) records captured in a worker process."""
+        for level, message in records:
+            if logger.level(level).no >= self.level_no:
+                _log.log(level, message)
+
+    def close(self):
+        """Waits until the queued messages are written."""
+        logger.complete()
 
-    def info(self, message: str):
-        logger.opt(depth=1).info(message)
+    def _keep(self, sample: str | None) -> bool:
+        every = self._sample_every.get(sample)
+        if every is None:
+            return True
+        count = self._sample_counts[sample] + 1
+        self._sample_counts[sample] = count
+        return every > 0 and count % every == 1 % every
 
-    def warning(self, message: str):
-        logger.opt(depth=1).warning(message)
 
-    def error(self, message: str):
-        logger.opt(depth=1).error(message)
+def capture_worker_logs():
+    """
+    Process pool initializer. Spawned workers don't inherit the sinks of
+    the parent, so their records are kept for `run_capturing_logs` to
+    return and the parent to `replay`.
+    """
+    logger.remove()
+    logger.add(
+        lambda message: _captured.append(
+            (message.record["level"].name, message.record["message"])
+        ),
+        level=0,
+    )
 
-    def debug(self, message: str):
-        logger.opt(depth=1).debug(message)
 
-    def critical(self, message: str):
-        logger.opt(depth=1).critical(message)
+def run_capturing_logs(function, *args):
+    """Returns `function(*args)` and the records it logged in this worker."""
+    _captured.clear()
+    try:
+        return function(*args), list(_captured)
+    finally:
+        _captured.clear()
@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from core.models.PropertyRecord import CARD_UPDATE_COLUMNS
+
+# Listings further than this many standard deviations from their location's
+# mean €/m² are flagged as overvalued or undervalued.
+VALUATION_Z_THRESHOLD = 1.5
+
+
+@dataclass
+class LocationMetrics:
+    """Per-location €/m² statistics, one array entry per location."""
+
+    location_ids: np.ndarray
+    counts: np.ndarray
+    means: np.ndarray
+    medians: np.ndarray
+    stds: np.ndarray
+
+    def to_dicts(self) -> list[dict]:
+        return [
+            {
+                "location_id": location_id,
+                "count": int(count),
+                "mean_price_per_square_meter": float(mean),
+                "median_price_per_square_meter": float(median),
+                "std_price_per_square_meter": float(std),
+            }
+            for location_id, count, mean, median, std in zip(
+                self.location_ids, self.counts, self.means, self.medians, self.stds
+            )
+        ]
+
+
+@dataclass
+class ListingMetrics:
+    """Per-listing €/m², deviation from its location and valuation flags."""
+
+    ids: np.ndarray
+    location_ids: np.ndarray
+    price_per_square_meter: np.ndarray
+    deviation: np.ndarray
+    z_scores: np.ndarray
+    is_overvalued: np.ndarray
+    is_undervalued: np.ndarray
+
+
+def latest_snapshot(table: pa.Table) -> pa.Table:
+    """
+    Keeps the most recent row of every listing across scrape dates. On the
+    same date a complete row wins over a partial one, then the row appended
+    last, as the store loads its files in append order.
+
+    Partial rows (when the table has `is_partial`) only update the card
+    columns of a listing already scraped with its details, like the upsert
+    into the database: its other columns come from its newest complete row.
+    """
+    if table.num_rows == 0 or "scrape_date" not in table.column_names:
+        return table
+    _, ids = _factorize(table.column("id"))
+    # ISO dates rank in chronological order.
+    dates = pc.rank(table.column("scrape_date"), tiebreaker="dense").to_numpy()
+    if "is_partial" in table.column_names:
+        partial = pc.fill_null(table.column("is_partial"), False).to_numpy()
+    else:
+        partial = np.zeros(table.num_rows, dtype=bool)
+    appended = np.arange(table.num_rows)
+    # Sort by id, newest first, and keep the first row of every id.
+    order = np.lexsort((-appended, partial, -dates.astype(np.int64), ids))
+    latest = _first_per_id(order, ids)
+    if not partial.any():
+        return table.take(pa.array(latest))
+
+    complete = _first_per_id(order[~partial[order]], ids)
+    base = latest.copy()
+    # Both are ordered by id code, and every id has a latest row.
+    base[np.searchsorted(ids[latest], ids[complete])] = complete
+    snapshot = table.take(pa.array(base))
+    latest_rows = pa.array(latest)
+    for column in (*CARD_UPDATE_COLUMNS[1:], "scrape_date"):
+        if column in snapshot.column_names:
+            snapshot = snapshot.set_column(
+                snapshot.column_names.index(column),
+                column,
+                table.column(column).take(latest_rows),
+            )
+    return snapshot
+
+
+def _first_per_id(order: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """First row of every id in `order`, which is sorted by id."""
+    sorted_ids = ids[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_ids[1:] != sorted_ids[:-1]
+    return order[first]
+
+
+def price_per_square_meter(table: pa.Table) -> tuple[pa.Table, np.ndarray]:
+    """
+    Returns the rows with a usable price and surface together with their
+    €/m². Rows without a surface (or with a zero one) and partial rows with
+    missing values are left out, matching Property.price_per_square_meter
+    never dividing by zero.
+    """
+    usable = pc.and_(
+        pc.is_valid(table.column("price_amount")),
+        pc.greater(pc.fill_null(table.column("square_meters"), 0), 0),
+    )
+    table = table.filter(usable)
+    prices = table.column("price_amount").to_numpy(zero_copy_only=False)
+    surfaces = table.column("square_meters").to_numpy(zero_copy_only=False)
+    return table, prices.astype(np.float64) / surfaces
+
+
+def location_metrics(table: pa.Table) -> LocationMetrics:
+    """Computes the €/m² count, mean, median and std of every location."""
+    table, values = price_per_square_meter(table)
+    location_ids, groups = _factorize(table.column("location_id"))
+    counts, means, stds = _grouped_moments(groups, values, len(location_ids))
+    return LocationMetrics(
+        location_ids=location_ids,
+        counts=counts,
+        means=means,
+        medians=_grouped_medians(groups, values, counts),
+        stds=stds,
+    )
+
+
+def listing_metrics(
+    table: pa.Table, z_threshold: float = VALUATION_Z_THRESHOLD
+) -> ListingMetrics:
+    """Scores every listing against the mean €/m² of its own location."""
+    table, values = price_per_square_meter(table)
+    location_ids, groups = _factorize(table.column("location_id"))
+    _, means, stds = _grouped_moments(groups, values, len(location_ids))
+    deviation = values - means[groups]
+    # A location with a single listing (or identical ones) has no spread.
+    spread = stds[groups]
+    z_scores = np.divide(
+        deviation, spread, out=np.zeros_like(deviation), where=spread > 0
+    )
+    return ListingMetrics(
+        ids=table.column("id").to_numpy(zero_copy_only=False),
+        location_ids=location_ids[groups],
+        price_per_square_meter=values,
+        deviation=deviation,
+        z_scores=z_scores,
+        is_overvalued=z_scores > z_threshold,
+        is_undervalued=z_scores < -z_threshold,
+    )
+
+
+def _grouped_moments(
+    groups: np.ndarray, values: np.ndarray, size: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    counts = np.bincount(groups, minlength=size)
+    safe_counts = np.maximum(counts, 1)
+    means = np.bincount(groups, weights=values, minlength=size) / safe_counts
+    # Population std from the centred values, which stays accurate for
+    # prices in the thousands where E[x²] - E[x]² loses precision.
+    centred = values - means[groups]
+    variances = np.bincount(groups, weights=centred * centred, minlength=size)
+    return counts, means, np.sqrt(variances / safe_counts)
+
+
+def _grouped_medians(
+    groups: np.ndarray, values: np.ndarray, counts: np.ndarray
+) -> np.ndarray:
+    if len(counts) == 0:
+        return np.zeros(0)
+    # Sorting by (group, value) lays every group out contiguously and in
+    # order, so each median is read straight from its group's offsets.
+    ordered = values[np.lexsort((values, groups))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    lower = starts + (counts - 1) // 2
+    upper = starts + counts // 2
+    return (ordered[lower] + ordered[upper]) / 2
+
+
+def _factorize(column: pa.ChunkedArray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the distinct values of a column and the integer code of every
+    row. Arrow hashes strings natively, far faster than np.unique on the
+    object arrays NumPy would build from them.
+    """
+    encoded = pc.dictionary_encode(column.combine_chunks())
+    return (
+        encoded.dictionary.to_numpy(zero_copy_only=False),
+        encoded.indices.to_numpy(zero_copy_only=False).astype(np.intp),
+    )
@@ -0,0 +1,257 @@
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class NullMetric:
+    """Stands in for every instrument when metrics are disabled."""
+
+    _timer = nullcontext()
+
+    def labels(self, **labels) -> "NullMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def time(self):
+        return self._timer
+
+
+NULL_METRIC = NullMetric()
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._children: dict[tuple, "Metric"] = {}
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        child = self._children.get(key)
+        if child is None:
+            child = self._new_child()
+            self._children[key] = child
+        return child
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if not self.label_names:
+            lines.extend(self._samples(""))
+        for key, child in list(self._children.items()):
+            labels = ",".join(
+                f'{name}="{value}"' for name, value in zip(self.label_names, key)
+            )
+            lines.extend(child._samples(labels))
+        return lines
+
+    def _new_child(self) -> "Metric":
+        raise NotImplementedError
+
+    def _samples(self, labels: str) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, help, label_names)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.help)
+
+    def _samples(self, labels: str) -> list[str]:
+        return [f"{self.name}{_braces(labels)} {self.value}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.help)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def _samples(self, labels: str) -> list[str]:
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == math.inf else repr(bound)
+            lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+        lines.append(f"{self.name}_sum{_braces(labels)} {self.sum}")
+        lines.append(f"{self.name}_count{_braces(labels)} {cumulative}")
+        return lines
+
+
+def _braces(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+class Metrics:
+    """
+    Registry of counters, gauges and histograms in the Prometheus format.
+
+    When disabled every instrument is the shared NULL_METRIC, whose methods
+    do nothing, so instrumented code costs a method call per event. Updates
+    happen on the event loop thread without locking; a scrape from the
+    exporter thread may see a histogram mid-update, which Prometheus
+    tolerates.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: dict[str, Metric] = {}
+        self._server: ThreadingHTTPServer | None = None
+        self._stop_dumping = threading.Event()
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        return self._register(Gauge, name, help, labels)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        if not self.enabled:
+            return NULL_METRIC
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = Histogram(name, help, labels, buckets)
+            self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """Exposes the metrics on http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def dump_periodically(self, path: str, interval: float) -> None:
+        """Rewrites `path` with the current metrics every `interval` seconds."""
+
+        def dump_loop():
+            while not self._stop_dumping.wait(interval):
+                self.dump(path)
+
+        threading.Thread(target=dump_loop, daemon=True).start()
+
+    def dump(self, path: str) -> None:
+        # Write then rename, so readers never see a half-written file.
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(self.render())
+        os.replace(temporary_path, path)
+
+    def close(self) -> None:
+        self._stop_dumping.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _register(self, metric_class, name: str, help: str, labels: tuple[str, ...]):
+        if not self.enabled:
+            return NULL_METRIC
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = metric_class(name, help, labels)
+            self._metrics[name] = metric
+        return metric
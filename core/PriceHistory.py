@@ -0,0 +1,224 @@
+import glob
+import os
+import time
+
+import numpy as np
+
+from constants.constants import PRICE_HISTORY_DIR
+from core.Logger import Logger
+
+PRICE = 0
+DELISTED = 1
+
+
+class PriceHistory:
+    """
+    Append-only log of listing price changes and delistings.
+
+    Each entry is a kind byte, the listing id and two zigzag varints: the
+    seconds and the price (in cents) elapsed since the listing's previous
+    entry in the same log, so a year of small price drops costs a few bytes
+    per change. A listing only gets an entry when its price differs from
+    the last one. Every writer appends to its own `<writer>.log`, which lets
+    workers sharing a crawl keep one history; the latest state of every
+    listing is rebuilt by replaying all the logs when opened. New entries
+    are buffered and appended by `flush`.
+
+    Delistings are found per location by diffing the sorted ids seen on
+    its last full crawl, kept as a NumPy array, with the current ones.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        directory: str = PRICE_HISTORY_DIR,
+        writer: str = "prices",
+    ):
+        self.logger = logger
+        self.directory = directory
+        self.log_path = os.path.join(directory, f"{writer}.log")
+        os.makedirs(os.path.join(directory, "seen"), exist_ok=True)
+        # id -> [first seen, last entry time, last price in cents, delisted at]
+        self.listings: dict[str, list] = {}
+        # id -> (time, cents) of its last entry in our own log.
+        self._last: dict[str, tuple[int, int]] = {}
+        self._buffer = bytearray()
+        self._repair()
+        for kind, listing_id, timestamp, cents, log_path in self._entries():
+            if log_path == self.log_path:
+                self._last[listing_id] = (timestamp, cents)
+            self._apply(kind, listing_id, timestamp, cents)
+        self.logger.info(
+            f"📈 Loaded the price history of {len(self.listings)} listings"
+        )
+
+    def record(
+        self, listing_id: str, price: float | None, timestamp: float | None = None
+    ) -> bool:
+        """Logs the price of a listing if it changed. Returns whether it did."""
+        if price is None:
+            return False
+        cents = round(price * 100)
+        state = self.listings.get(listing_id)
+        if state is not None and state[2] == cents and state[3] is None:
+            return False
+        self._append(PRICE, listing_id, int(timestamp or time.time()), cents)
+        return True
+
+    def detect_delisted(
+        self, location_id: str, seen_ids, timestamp: float | None = None
+    ) -> np.ndarray:
+        """
+        Compares the ids seen on a full crawl of a location with the ones
+        seen on its previous full crawl, logs the missing ones as delisted
+        and returns them.
+        """
+        current = np.unique(np.asarray(list(seen_ids), dtype=str))
+        path = os.path.join(self.directory, "seen", f"{location_id}.npy")
+        delisted = np.asarray([], dtype=str)
+        if os.path.exists(path):
+            previous = np.load(path, allow_pickle=False)
+            delisted = np.setdiff1d(previous, current, assume_unique=True)
+        timestamp = int(timestamp or time.time())
+        for listing_id in delisted.tolist():
+            state = self.listings.get(listing_id)
+            if state is not None and state[3] is None:
+                self._append(DELISTED, listing_id, timestamp, state[2])
+        np.save(path, current, allow_pickle=False)
+        return delisted
+
+    def time_on_market(self, now: float | None = None) -> dict[str, float]:
+        """Days each listing has been (or was, if delisted) on the market."""
+        now = now or time.time()
+        return {
+            listing_id: ((delisted_at or now) - first_seen) / 86400
+            for listing_id, (first_seen, _, _, delisted_at) in self.listings.items()
+        }
+
+    def average_selling_time(self) -> float | None:
+        """Mean days on the market of the delisted listings."""
+        days = [
+            (delisted_at - first_seen) / 86400
+            for first_seen, _, _, delisted_at in self.listings.values()
+            if delisted_at is not None
+        ]
+        return sum(days) / len(days) if days else None
+
+    def history(self, listing_id: str) -> list[tuple[int, float | None]]:
+        """Every (timestamp, price) of a listing; None marks a delisting."""
+        self.flush()
+        return [
+            (timestamp, cents / 100 if kind == PRICE else None)
+            for kind, entry_id, timestamp, cents, _ in self._entries()
+            if entry_id == listing_id
+        ]
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        with open(self.log_path, "ab") as log:
+            log.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+    def _repair(self) -> None:
+        """Cuts an entry torn by a crash off the end of our own log."""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "rb") as log:
+            data = log.read()
+        end = 0
+        for *_, end in _decode(data):
+            pass
+        if end < len(data):
+            self.logger.warning(
+                f"⚠️ Dropping {len(data) - end} bytes of a torn entry"
+                f" from {self.log_path}"
+            )
+            with open(self.log_path, "r+b") as log:
+                log.truncate(end)
+
+    def _entries(self):
+        """Every entry of every log, oldest first."""
+        entries = []
+        for log_path in glob.glob(os.path.join(self.directory, "*.log")):
+            with open(log_path, "rb") as log:
+                # Other writers may be appending: their torn tails are skipped.
+                entries.extend((*entry, log_path) for *entry, _ in _decode(log.read()))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def _append(self, kind: int, listing_id: str, timestamp: int, cents: int) -> None:
+        previous_time, previous_cents = self._last.get(listing_id, (0, 0))
+        self._last[listing_id] = (timestamp, cents)
+        encoded_id = listing_id.encode("utf-8")
+        self._buffer.append(kind)
+        _write_varint(self._buffer, len(encoded_id))
+        self._buffer += encoded_id
+        _write_varint(self._buffer, _zigzag(timestamp - previous_time))
+        _write_varint(self._buffer, _zigzag(cents - previous_cents))
+        self._apply(kind, listing_id, timestamp, cents)
+
+    def _apply(self, kind: int, listing_id: str, timestamp: int, cents: int) -> None:
+        state = self.listings.get(listing_id)
+        if state is None:
+            state = self.listings[listing_id] = [timestamp, timestamp, cents, None]
+        state[1] = timestamp
+        state[2] = cents
+        state[3] = timestamp if kind == DELISTED else None
+
+
+def _decode(data: bytes):
+    """
+    Yields (kind, id, timestamp, cents, end) from an encoded log, `end` being
+    the offset past the entry. Stops at an incomplete trailing entry.
+    """
+    last: dict[str, tuple[int, int]] = {}
+    position = 0
+    while position < len(data):
+        try:
+            kind = data[position]
+            length, start = _read_varint(data, position + 1)
+            if start + length > len(data):
+                return
+            listing_id = data[start : start + length].decode("utf-8")
+            time_delta, end = _read_varint(data, start + length)
+            price_delta, end = _read_varint(data, end)
+        except IndexError:
+            return
+        position = end
+        previous_time, previous_cents = last.get(listing_id, (0, 0))
+        entry = (
+            previous_time + _unzigzag(time_delta),
+            previous_cents + _unzigzag(price_delta),
+        )
+        last[listing_id] = entry
+        yield kind, listing_id, *entry, position
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
@@ -0,0 +1,16 @@
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+
+@dataclass
+class LocationStats:
+    location_id: str
+    scraped_properties: int
+    mean_price: float
+    mean_price_per_square_meter: float
+    median_price_per_square_meter: float
+    std_price_per_square_meter: float
+    updated_at: datetime | None = field(default=None)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, field_validator
 
+VALID_CURRENCIES = frozenset({"EUR", "USD", "GBP"})
+
 
 class Money(BaseModel):
     amount: float
@@ -7,8 +9,7 @@ class Money(BaseModel):
 
     @field_validator("currency")
     def validate_currency(cls, v):
-        valid_currencies = {"EUR", "USD", "GBP"}
-        if v not in valid_currencies:
+        if v not in VALID_CURRENCIES:
             raise ValueError(f"Moneda no válida: {v}")
         return v
 
@@ -1,9 +1,22 @@
+from typing import ClassVar
+
 from pydantic import BaseModel
 
 from core.models.Money import Money
 
 
 class Property(BaseModel):
+    # Fields known from a search result card, without the detail page.
+    PARTIAL_FIELDS: ClassVar[tuple[str, ...]] = (
+        "id",
+        "price",
+        "title",
+        "square_meters",
+        "rooms",
+        "url",
+        "is_partial",
+    )
+
     id: str
     price: Money
     title: str
@@ -23,6 +36,7 @@ class Property(BaseModel):
     location: str
     is_illegally_occupied: bool
     url: str
+    is_partial: bool = False
 
     @property
     def price_per_square_meter(self) -> float:
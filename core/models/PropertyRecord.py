@@ -0,0 +1,195 @@
+from operator import attrgetter
+from typing import Any
+
+from core.models.Money import VALID_CURRENCIES
+from core.models.Property import Property
+
+STRING_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "address",
+    "agency_name",
+    "location",
+    "url",
+)
+INTEGER_FIELDS = ("square_meters", "rooms", "bathrooms")
+BOOLEAN_FIELDS = (
+    "has_garage",
+    "has_garden",
+    "has_pool",
+    "has_terrace",
+    "is_new_development",
+    "needs_renovation",
+    "is_in_good_condition",
+    "is_illegally_occupied",
+)
+TRUE_STRINGS = frozenset({"1", "true", "t", "yes", "y", "on"})
+FALSE_STRINGS = frozenset({"0", "false", "f", "no", "n", "off"})
+# Columns of a partial row, with the price flattened like in every row.
+PARTIAL_COLUMNS = (
+    *(field for field in Property.PARTIAL_FIELDS if field != "price"),
+    "price_amount",
+    "price_currency",
+    "location_id",
+)
+# Columns a card updates on a listing that is already stored: its title and
+# is_partial stay those of the detail page, when it was fetched.
+CARD_UPDATE_COLUMNS = ("id", "price_amount", "price_currency", "square_meters", "rooms")
+
+
+class PropertyRecord:
+    """
+    Validated property in the flat shape of a Properties row.
+
+    Applies the same rules as Property and Money (required fields, lax
+    type coercion, non-negative amount, known currency) without building
+    the two pydantic models and dumping them back into a dict. Invalid
+    input raises ValueError, like pydantic's ValidationError does.
+    """
+
+    __slots__ = (
+        *STRING_FIELDS,
+        *INTEGER_FIELDS,
+        *BOOLEAN_FIELDS,
+        "price_amount",
+        "price_currency",
+        "is_partial",
+        "location_id",
+    )
+
+    @classmethod
+    def from_details(
+        cls, details: dict[str, Any], location_id: str | None
+    ) -> "PropertyRecord":
+        """Validates the fields extracted by PropertyParser or a partial card."""
+        record = cls.__new__(cls)
+        is_partial = details.get("is_partial", False)
+        if type(is_partial) is not bool:
+            is_partial = _boolean("is_partial", is_partial)
+        # Values already of the exact type, as PropertyParser outputs them,
+        # skip the coercion helpers.
+        for name in STRING_FIELDS:
+            value = (
+                details[name]
+                if name in details
+                else _field(details, name, is_partial, "")
+            )
+            setattr(record, name, value if type(value) is str else _string(name, value))
+        for name in INTEGER_FIELDS:
+            value = (
+                details[name]
+                if name in details
+                else _field(details, name, is_partial, 0)
+            )
+            setattr(
+                record, name, value if type(value) is int else _integer(name, value)
+            )
+        for name in BOOLEAN_FIELDS:
+            value = (
+                details[name]
+                if name in details
+                else _field(details, name, is_partial, False)
+            )
+            setattr(
+                record, name, value if type(value) is bool else _boolean(name, value)
+            )
+        price = _field(details, "price", is_partial, None)
+        if not isinstance(price, dict):
+            raise ValueError(f"price: Input should be a valid dictionary: {price!r}")
+        record.price_amount = _amount(_field(price, "amount", False, None))
+        record.price_currency = _currency(_field(price, "currency", False, None))
+        record.is_partial = is_partial
+        record.location_id = location_id
+        return record
+
+    @classmethod
+    def validate_batch(
+        cls, items: list[dict[str, Any]], location_id: str | None
+    ) -> tuple[list[dict], list[tuple[dict, ValueError]]]:
+        """
+        Turns a page's worth of extracted fields into database rows. Invalid
+        items don't stop the batch; they are returned with their error.
+        """
+        rows = []
+        errors = []
+        for item in items:
+            try:
+                rows.append(cls.from_details(item, location_id).to_row())
+            except ValueError as e:
+                errors.append((item, e))
+        return rows, errors
+
+    def to_row(self) -> dict:
+        # Partial rows only carry the card columns, so their upsert doesn't
+        # blank the detail columns of a row already stored.
+        if self.is_partial:
+            return dict(zip(PARTIAL_COLUMNS, _partial_values(self)))
+        return dict(zip(self.__slots__, _values(self)))
+
+
+_values = attrgetter(*PropertyRecord.__slots__)
+_partial_values = attrgetter(*PARTIAL_COLUMNS)
+
+
+def _field(details: dict, name: str, is_partial: bool, default: Any) -> Any:
+    if name in details:
+        return details[name]
+    # Partial properties only come with the card fields.
+    if is_partial and name not in Property.PARTIAL_FIELDS:
+        return default
+    raise ValueError(f"{name}: Field required")
+
+
+def _string(name: str, value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{name}: Input should be a valid string: {value!r}")
+    return value
+
+
+def _integer(name: str, value: Any) -> int:
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ValueError(f"{name}: Input should be a valid integer: {value!r}")
+
+
+def _boolean(name: str, value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in TRUE_STRINGS:
+            return True
+        if lowered in FALSE_STRINGS:
+            return False
+    raise ValueError(f"{name}: Input should be a valid boolean: {value!r}")
+
+
+def _amount(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        amount = float(value)
+    elif isinstance(value, str):
+        try:
+            amount = float(value.strip())
+        except ValueError:
+            raise ValueError(f"amount: Input should be a valid number: {value!r}")
+    else:
+        raise ValueError(f"amount: Input should be a valid number: {value!r}")
+    if amount < 0:
+        raise ValueError(f"El monto no puede ser negativo {amount}")
+    return amount
+
+
+def _currency(value: Any) -> str:
+    if value not in VALID_CURRENCIES:
+        raise ValueError(f"Moneda no válida: {value}")
+    return value
@@ -0,0 +1,46 @@
+import asyncio
+
+from scraper.Fetcher import is_blocked
+from scraper.ResponseCache import CachedResponse, ResponseCache
+
+
+class CachingSession:
+    """
+    Drop-in replacement for AsyncSession that goes through a ResponseCache.
+    Requests the cache can't answer are sent through `session`.
+
+    Responses already fetched today are served from the cache and successful
+    ones are stored. In replay mode no connection is ever opened: every URL
+    is answered with its most recent cached response, or a 404 when the URL
+    was never fetched. The cache is read and written from worker threads,
+    keeping its disk and SQLite I/O off the event loop.
+    """
+
+    def __init__(self, cache: ResponseCache, session, replay: bool = False):
+        self.cache = cache
+        self.replay = replay
+        self.session = None if replay else session
+
+    async def __aenter__(self):
+        if self.session is not None:
+            await self.session.__aenter__()
+        return self
+
+    async def __aexit__(self, *args):
+        if self.session is not None:
+            await self.session.__aexit__(*args)
+
+    async def get(self, url: str, **kwargs):
+        if self.replay:
+            cached = await asyncio.to_thread(self.cache.get, url)
+            return cached or CachedResponse(url, 404, b"")
+
+        cached = await asyncio.to_thread(self.cache.get, url, ResponseCache.today())
+        if cached is not None:
+            return cached
+
+        response = await self.session.get(url, **kwargs)
+        # DataDome may answer a challenge with a 200: never replay those.
+        if response.status_code == 200 and not is_blocked(response):
+            await asyncio.to_thread(self.cache.put, url, response)
+        return response
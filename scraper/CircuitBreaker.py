@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from constants.constants import (
+    BREAKER_COOLDOWN_SECONDS,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_COOLDOWN_SECONDS,
+)
+from core.Logger import Logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Pauses the requests to a host after too many consecutive failures.
+
+    After `failure_threshold` failures in a row the circuit opens and every
+    caller of `wait` sleeps until the cooldown ends. Then a single probe
+    request goes through (half-open): a success closes the circuit, a
+    failure opens it again with a cooldown twice as long, up to
+    `max_cooldown`. Only the probe's outcome counts while half-open: late
+    answers to requests sent before the circuit opened are ignored.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        host: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN_SECONDS,
+        max_cooldown: float = BREAKER_MAX_COOLDOWN_SECONDS,
+    ):
+        self.logger = logger
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self._probing = False
+
+    async def wait(self) -> bool:
+        """
+        Returns once a request to the host may be sent: True when it is the
+        half-open probe, which must end in record_success, record_failure
+        or release.
+        """
+        while True:
+            if self.state == CLOSED:
+                return False
+            remaining = self.opened_until - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            if not self._probing:
+                if self.state == OPEN:
+                    self.state = HALF_OPEN
+                    self.logger.info(f"🟡 Circuit of {self.host} half-open, probing")
+                self._probing = True
+                return True
+            # Another request is probing: check again shortly.
+            await asyncio.sleep(min(1.0, self.base_cooldown))
+
+    def record_success(self, probe: bool = False) -> None:
+        # A request sent before the circuit opened doesn't prove it recovered.
+        if self.state == OPEN or (self.state == HALF_OPEN and not probe):
+            return
+        self.failures = 0
+        self._probing = False
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.cooldown = self.base_cooldown
+            self.logger.info(f"🟢 Circuit of {self.host} closed, resuming")
+
+    def release(self) -> None:
+        """Lets another request probe when ours ended without an answer."""
+        self._probing = False
+
+    def record_failure(self, probe: bool = False) -> None:
+        if self.state != CLOSED and not probe:
+            return
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self._probing = False
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_until = time.monotonic() + self.cooldown
+        self.logger.warning(
+            f"🔴 Circuit of {self.host} open after {self.failures} failures,"
+            f" pausing {self.cooldown:.0f}s"
+        )
@@ -0,0 +1,131 @@
+import os
+import sqlite3
+
+from constants.constants import CHECKPOINT_PATH
+from core.Logger import Logger
+
+
+class CrawlCheckpoint:
+    """
+    Crawl frontier persisted in SQLite so an interrupted run can resume.
+
+    Per location it keeps whether the crawl completed and the next result
+    page still to fetch (NULL once the last page was read), plus the
+    property links queued but not yet saved. Updates go to in-memory
+    buffers and reach the disk in one transaction per `flush`, so a crash
+    only loses the last few seconds of progress, which are fetched again.
+    """
+
+    def __init__(self, logger: Logger, path: str = CHECKPOINT_PATH):
+        self.logger = logger
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS locations ("
+                "id TEXT PRIMARY KEY, next_page TEXT, completed INTEGER NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS pending_links ("
+                "id TEXT PRIMARY KEY, location_id TEXT NOT NULL, url TEXT NOT NULL"
+                ") WITHOUT ROWID"
+            )
+        self.locations: dict[str, tuple[str | None, bool]] = {
+            location_id: (next_page, bool(completed))
+            for location_id, next_page, completed in self.connection.execute(
+                "SELECT id, next_page, completed FROM locations"
+            )
+        }
+        self._dirty_locations: set[str] = set()
+        self._added_links: dict[str, tuple[str, str]] = {}
+        self._done_links: set[str] = set()
+
+    def reset(self) -> None:
+        """Forgets the previous run, for a crawl that starts from scratch."""
+        with self.connection:
+            self.connection.execute("DELETE FROM locations")
+            self.connection.execute("DELETE FROM pending_links")
+        self.locations.clear()
+        self._dirty_locations.clear()
+        self._added_links.clear()
+        self._done_links.clear()
+
+    def is_completed(self, location_id: str) -> bool:
+        return self.locations.get(location_id, (None, False))[1]
+
+    def resume_point(self, location_id: str, start_url: str) -> str | None:
+        """The next result page of a location: `start_url` if it never started."""
+        if location_id not in self.locations:
+            return start_url
+        return self.locations[location_id][0]
+
+    def pending_links(self, location_id: str) -> list[dict]:
+        self.flush()
+        return [
+            {"id": link_id, "url": url}
+            for link_id, url in self.connection.execute(
+                "SELECT id, url FROM pending_links WHERE location_id = ?",
+                (location_id,),
+            )
+        ]
+
+    def page_done(self, location_id: str, next_page: str | None) -> None:
+        self.locations[location_id] = (next_page, False)
+        self._dirty_locations.add(location_id)
+
+    def add_link(self, location_id: str, card: dict) -> None:
+        self._added_links[self.link_key(card)] = (location_id, card["url"])
+
+    def links_done(self, link_keys: list[str]) -> None:
+        for key in link_keys:
+            # A link queued and done within the same flush never hits the disk.
+            if self._added_links.pop(key, None) is None:
+                self._done_links.add(key)
+
+    def complete(self, location_id: str) -> None:
+        self.locations[location_id] = (None, True)
+        self._dirty_locations.add(location_id)
+        self.flush()
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM pending_links WHERE location_id = ?", (location_id,)
+            )
+
+    def flush(self) -> None:
+        if not (self._dirty_locations or self._added_links or self._done_links):
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO locations (id, next_page, completed) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                "next_page = excluded.next_page, completed = excluded.completed",
+                [
+                    (location_id, *self.locations[location_id])
+                    for location_id in self._dirty_locations
+                ],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO pending_links (id, location_id, url) "
+                "VALUES (?, ?, ?)",
+                [
+                    (key, location_id, url)
+                    for key, (location_id, url) in self._added_links.items()
+                ],
+            )
+            self.connection.executemany(
+                "DELETE FROM pending_links WHERE id = ?",
+                [(key,) for key in self._done_links],
+            )
+        self._dirty_locations.clear()
+        self._added_links.clear()
+        self._done_links.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    @staticmethod
+    def link_key(card: dict) -> str:
+        return card["id"] or card["url"]
@@ -0,0 +1,67 @@
+import math
+import time
+
+from constants.constants import PROPERTIES_PER_PAGE
+from core.Logger import Logger
+
+
+class CrawlProgress:
+    """
+    Tracks a crawl over many locations in estimated requests.
+
+    A location with n listings costs about n detail requests plus
+    ceil(n / PROPERTIES_PER_PAGE) result pages. Progress inside a location is
+    capped at its estimate so a stale `number_of_properties` cannot push the
+    overall progress past 100%.
+    """
+
+    def __init__(self, logger: Logger, locations: list[dict]):
+        self.logger = logger
+        self.started_at = time.monotonic()
+        self.estimates = {
+            location.get("id"): self.estimate_cost(location) for location in locations
+        }
+        self.total_cost = sum(self.estimates.values()) or 1
+        self.total_locations = len(locations)
+        self.completed_locations = 0
+        self._done: dict[str | None, int] = {}
+
+    @staticmethod
+    def estimate_cost(location: dict) -> int:
+        properties = location.get("number_of_properties") or 0
+        return properties + max(1, math.ceil(properties / PROPERTIES_PER_PAGE))
+
+    @property
+    def done_cost(self) -> int:
+        return sum(self._done.values())
+
+    def advance(self, location_id: str | None, requests: int = 1) -> None:
+        estimate = self.estimates.get(location_id, 0)
+        self._done[location_id] = min(
+            estimate, self._done.get(location_id, 0) + requests
+        )
+
+    def complete(self, location_id: str | None) -> None:
+        self._done[location_id] = self.estimates.get(location_id, 0)
+        self.completed_locations += 1
+        self.report()
+
+    def eta_seconds(self) -> float | None:
+        done = self.done_cost
+        if done == 0:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        return elapsed / done * (self.total_cost - done)
+
+    def report(self) -> None:
+        eta = self.eta_seconds()
+        eta_text = "unknown" if eta is None else self._format_duration(eta)
+        self.logger.info(
+            f"📈 Progress: {self.completed_locations}/{self.total_locations} locations, "
+            f"{self.done_cost / self.total_cost:.1%} of estimated requests, ETA {eta_text}"
+        )
+
+    def _format_duration(self, seconds: float) -> str:
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}h {minutes:02d}m {seconds:02d}s"
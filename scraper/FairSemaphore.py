@@ -0,0 +1,73 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Hashable
+
+
+class FairSemaphore:
+    """
+    Semaphore that hands out free slots round-robin across keys.
+
+    A plain asyncio.Semaphore is FIFO, so a location that queues 30 detail
+    requests at once starves every other location until they are served.
+    Here each key has its own waiter queue and released slots rotate over
+    the keys that are waiting.
+    """
+
+    def __init__(self, value: int):
+        if value < 1:
+            raise ValueError("FairSemaphore value must be at least 1")
+        self._value = value
+        self._waiters: OrderedDict[Hashable, deque[asyncio.Future]] = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def acquire(self, key: Hashable) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted right before cancellation: pass it on.
+                self.release()
+            else:
+                self._discard(key, future)
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            key, waiters = self._waiters.popitem(last=False)
+            future = waiters.popleft()
+            if waiters:
+                # The key goes to the back of the rotation.
+                self._waiters[key] = waiters
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable):
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _discard(self, key: Hashable, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(key)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            return
+        if not waiters:
+            del self._waiters[key]
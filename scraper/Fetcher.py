@@ -0,0 +1,187 @@
+import asyncio
+import math
+import random
+from collections.abc import Awaitable, Callable
+from urllib.parse import urlsplit
+
+from constants.constants import (
+    BACKOFF_BASE_SECONDS,
+    BACKOFF_MAX_SECONDS,
+    FETCH_MAX_RETRIES,
+    MIN_REQUESTS_PER_SECOND,
+    RATE_DECREASE_FACTOR,
+    RATE_INCREASE_FRACTION,
+)
+from core.Logger import Logger
+from core.Metrics import Metrics
+from scraper.CircuitBreaker import CircuitBreaker
+from scraper.RateLimiter import RateLimiter
+
+BLOCK_STATUS_CODES = frozenset({403, 429})
+# DataDome serves its challenge from this host, sometimes with a 200.
+CAPTCHA_MARKERS = (b"captcha-delivery.com", b"geo.captcha-delivery")
+# Challenge pages are a few KB; real result and detail pages are far larger.
+CHALLENGE_MAX_BYTES = 20_000
+
+
+class BlockedError(Exception):
+    """Raised when a URL is still blocked after every retry."""
+
+
+def is_blocked(response) -> bool:
+    if response.status_code in BLOCK_STATUS_CODES:
+        return True
+    content = response.content
+    if len(content) > CHALLENGE_MAX_BYTES:
+        return False
+    return any(marker in content for marker in CAPTCHA_MARKERS)
+
+
+class Fetcher:
+    """
+    Sends requests through the rate limiter with retries and back-pressure.
+
+    Block (403/429) and captcha responses, 5xx responses and connection
+    errors are retried with exponential backoff and full jitter, honouring
+    Retry-After. Every host has a CircuitBreaker that pauses all its
+    requests after consecutive blocks, and its request rate follows AIMD:
+    halved on every block, raised by a fraction of the configured rate on
+    every success, never above it.
+
+    Other responses, 404s included, are returned for the caller to handle.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        rate_limiter: RateLimiter,
+        metrics: Metrics | None = None,
+        max_retries: int = FETCH_MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE_SECONDS,
+        backoff_max: float = BACKOFF_MAX_SECONDS,
+    ):
+        self.logger = logger
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breakers: dict[str, CircuitBreaker] = {}
+        metrics = metrics or Metrics(enabled=False)
+        self.blocks_total = metrics.counter(
+            "scraper_blocks_total", "Block and captcha responses by host", ("host",)
+        )
+        self.retries_total = metrics.counter(
+            "scraper_retries_total", "Requests sent again after a failure"
+        )
+        self.request_rate = metrics.gauge(
+            "scraper_request_rate", "Current requests per second by host", ("host",)
+        )
+
+    async def fetch(self, url: str, send: Callable[[], Awaitable]):
+        """
+        Returns the response of `send()` for `url`, retrying blocks and
+        transient failures. Raises BlockedError once retries run out.
+        """
+        host = urlsplit(url).netloc
+        breaker = self._breaker(host)
+        for attempt in range(self.max_retries + 1):
+            probing = await breaker.wait()
+            retry_after = None
+            try:
+                await self.rate_limiter.acquire(url)
+                response = await send()
+            except asyncio.CancelledError:
+                if probing:
+                    breaker.release()
+                raise
+            except Exception as e:
+                breaker.record_failure(probing)
+                if attempt == self.max_retries:
+                    raise
+                self.logger.warning(f"⚠️ Request to {url} failed: {e}")
+            else:
+                if is_blocked(response):
+                    self._blocked(host, breaker, response, probing)
+                    retry_after = _retry_after(response)
+                elif response.status_code >= 500:
+                    breaker.record_failure(probing)
+                    self.logger.warning(
+                        f"⚠️ HTTP {response.status_code} from {url}, retrying"
+                    )
+                else:
+                    breaker.record_success(probing)
+                    self._speed_up(host)
+                    return response
+                if attempt == self.max_retries:
+                    break
+
+            self.retries_total.inc()
+            delay = self._backoff(attempt)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.backoff_max))
+            self.logger.debug("🔁 Retrying {} in {:.1f}s", url, delay)
+            await asyncio.sleep(delay)
+
+        if is_blocked(response):
+            raise BlockedError(f"Blocked fetching {url} (HTTP {response.status_code})")
+        return response
+
+    async def send_once(self, url: str, send: Callable[[], Awaitable]):
+        """
+        Sends an extra request on behalf of one already admitted by `fetch`,
+        such as a session warm-up: it takes its own rate limiter token and
+        its blocks count against the host, but it neither waits for the
+        circuit breaker (which the admitted request may be probing) nor
+        retries.
+        """
+        host = urlsplit(url).netloc
+        await self.rate_limiter.acquire(url)
+        response = await send()
+        if is_blocked(response):
+            self._blocked(host, self._breaker(host), response, probing=False)
+        return response
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(self.logger, host)
+        return breaker
+
+    def _blocked(
+        self, host: str, breaker: CircuitBreaker, response, probing: bool
+    ) -> None:
+        self.blocks_total.labels(host=host).inc()
+        breaker.record_failure(probing)
+        rate = self.rate_limiter.rate(host)
+        if math.isinf(rate):
+            return
+        slower = max(MIN_REQUESTS_PER_SECOND, rate * RATE_DECREASE_FACTOR)
+        self.rate_limiter.set_rate(host, slower)
+        self.request_rate.labels(host=host).set(slower)
+        self.logger.warning(
+            f"🛑 Blocked by {host} (HTTP {response.status_code}),"
+            f" slowing down to {slower:.3f} req/s"
+        )
+
+    def _speed_up(self, host: str) -> None:
+        rate = self.rate_limiter.rate(host)
+        ceiling = self.rate_limiter.requests_per_second
+        if rate >= ceiling:
+            return
+        faster = min(ceiling, rate + ceiling * RATE_INCREASE_FRACTION)
+        self.rate_limiter.set_rate(host, faster)
+        self.request_rate.labels(host=host).set(faster)
+        if faster == ceiling:
+            self.logger.info(f"🚀 Back to {faster:.3f} req/s on {host}")
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads the retries of concurrent requests apart.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+def _retry_after(response) -> float | None:
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
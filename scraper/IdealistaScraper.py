@@ -1,144 +1,235 @@
 import asyncio
-import json
-import random
-import re
+import multiprocessing
+import os
+import socket
 import time
-
-from bs4 import BeautifulSoup
-from curl_cffi.requests import AsyncSession
-
-from constants.constants import BASE_URL
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from constants.constants import (
+    ALERT_DISCOUNT,
+    BASE_URL,
+    CHECKPOINT_FLUSH_INTERVAL,
+    LINK_QUEUE_SIZE,
+    LOCATION_WORKERS,
+    MAX_CONCURRENT_REQUESTS,
+    PARSE_WORKERS,
+    PROGRESS_REPORT_INTERVAL,
+    WORK_HEARTBEAT_INTERVAL,
+    WRITE_BATCH_SIZE,
+    WRITE_FLUSH_INTERVAL,
+)
+from core.AlertStream import AlertStream
+from core.AnalyticsStore import AnalyticsStore
+from core.ComparablesIndex import ComparablesIndex
 from core.Database import Database
-from core.Logger import Logger
-from core.models.Money import Money
-from core.models.Property import Property
+from core.DuplicateIndex import DuplicateIndex
+from core.Logger import Logger, capture_worker_logs, run_capturing_logs
+from core.MarketMetrics import latest_snapshot, location_metrics
+from core.Metrics import Metrics
+from core.models.LocationStats import LocationStats
+from core.models.PropertyRecord import PropertyRecord
+from core.PriceHistory import PriceHistory
+from scraper.CachingSession import CachingSession
+from scraper.CrawlCheckpoint import CrawlCheckpoint
+from scraper.CrawlProgress import CrawlProgress
+from scraper.FairSemaphore import FairSemaphore
+from scraper.Fetcher import Fetcher
+from scraper.ListingIndex import ListingIndex
+from scraper.ListingParser import ListingParser
+from scraper.PropertyParser import PropertyParser
+from scraper.RateLimiter import RateLimiter
+from scraper.ResponseCache import ResponseCache
+from scraper.SessionPool import SessionPool
+from scraper.WorkQueue import WorkQueue
 
 
 class IdealistaScraper:
-    def __init__(self, database: Database, logger: Logger):
+    def __init__(
+        self,
+        database: Database,
+        logger: Logger,
+        rate_limiter: RateLimiter | None = None,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        location_workers: int = LOCATION_WORKERS,
+        listing_index: ListingIndex | None = None,
+        response_cache: ResponseCache | None = None,
+        replay: bool = False,
+        parse_workers: int = PARSE_WORKERS,
+        base_url: str = BASE_URL,
+        metrics: Metrics | None = None,
+        list_only: bool = False,
+        detail_filter: Callable[[dict], bool] | None = None,
+        analytics_store: AnalyticsStore | None = None,
+        checkpoint: CrawlCheckpoint | None = None,
+        resume: bool = False,
+        work_queue: WorkQueue | None = None,
+        cycle_id: str | None = None,
+        worker_id: str | None = None,
+        heartbeat_interval: float = WORK_HEARTBEAT_INTERVAL,
+        comparables: ComparablesIndex | None = None,
+        alerts: AlertStream | None = None,
+        alert_discount: float = ALERT_DISCOUNT,
+        price_history: PriceHistory | None = None,
+        duplicates: DuplicateIndex | None = None,
+    ):
         self.database = database
-        self.semaphore = asyncio.Semaphore(3)
+        self.semaphore = FairSemaphore(max_concurrency)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.location_workers = location_workers
+        self.detail_workers = max_concurrency
+        self.progress: CrawlProgress | None = None
         self.session = None
         self.logger = logger
+        self.base_url = base_url
+        self.parser = PropertyParser(logger, base_url)
+        self.listing_parser = ListingParser(base_url)
+        self.parse_workers = parse_workers
+        self.executor: ProcessPoolExecutor | None = None
+        self.listing_index = listing_index
+        self.response_cache = response_cache
+        self.replay = replay
+        self.list_only = list_only
+        self.detail_filter = detail_filter
+        self.analytics_store = analytics_store
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.work_queue = work_queue
+        self.cycle_id = cycle_id or datetime.now(timezone.utc).date().isoformat()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_interval = heartbeat_interval
+        self.comparables = comparables
+        self.alerts = alerts
+        self.alert_discount = alert_discount
+        self.price_history = price_history
+        self.duplicates = duplicates
+        # Ids on the result pages crawled per location, for delisting detection
+        # and to leave delisted listings out of the location stats.
+        self._seen: dict[str, set[str]] = defaultdict(set)
+        # (price, m²) of the properties saved per location in this run.
+        self._saved: dict[str, dict[str, tuple]] = defaultdict(dict)
+        metrics = metrics or Metrics(enabled=False)
+        self.fetcher = Fetcher(logger, self.rate_limiter, metrics)
+        self._register_metrics(metrics)
+
+    def _register_metrics(self, metrics: Metrics):
+        self.fetch_seconds = metrics.histogram(
+            "scraper_fetch_seconds", "HTTP fetch latency by status code", ("status",)
+        )
+        self.slot_wait_seconds = metrics.histogram(
+            "scraper_slot_wait_seconds", "Time spent waiting for a request slot"
+        )
+        self.stage_seconds = metrics.histogram(
+            "scraper_stage_seconds",
+            "CPU time of the parse, extract, validate, score and dedupe stages",
+            ("stage",),
+        )
+        self.write_seconds = metrics.histogram(
+            "scraper_db_write_seconds", "Latency of a batched properties write"
+        )
+        self.write_batch_size = metrics.histogram(
+            "scraper_db_write_batch_size",
+            "Rows per properties write",
+            buckets=(1, 5, 10, 30, 60, 100, 250, 500),
+        )
+        self.queue_depth = metrics.gauge(
+            "scraper_queue_depth", "Items waiting in the pipeline queues", ("queue",)
+        )
+        self.pages_total = metrics.counter(
+            "scraper_pages_total", "Pages fetched by kind", ("kind",)
+        )
+        self.properties_skipped = metrics.counter(
+            "scraper_properties_skipped_total",
+            "Listings not fetched because they are unchanged",
+        )
+        self.alerts_total = metrics.counter(
+            "scraper_alerts_total", "Listings priced below their estimated value"
+        )
+        self.price_changes_total = metrics.counter(
+            "scraper_price_changes_total", "Listings whose price changed"
+        )
+        self.duplicates_total = metrics.counter(
+            "scraper_duplicates_total", "Listings duplicating an earlier listing"
+        )
+        self.delisted_total = metrics.counter(
+            "scraper_delisted_total", "Listings gone since the previous full crawl"
+        )
 
-    async def get_property_data(self, session, property_url: str) -> Property | None:
-        details = await self._fetch_property_details(session, property_url)
+    async def get_property_data(
+        self, session, property_url: str, location_id: str | None = None
+    ) -> dict | None:
+        """Returns the validated database row of a property."""
+        details = await self._fetch_property_details(session, property_url, location_id)
         if details:
-            return Property(**details)
+            with self.stage_seconds.labels(stage="validate").time():
+                return PropertyRecord.from_details(details, location_id).to_row()
 
-        self.logger.debug(f"❌ No details found for property: {property_url}")
+        self.logger.debug("❌ No details found for property: {}", property_url)
         return None
 
-    async def _fetch_property_details(self, session, property_url):
-        async with self.semaphore:
-            try:
-                response = await session.get(f"{BASE_URL}{property_url}")
-                response.raise_for_status()
-            except Exception as e:
-                self.logger.error(f"Failed to fetch {property_url}: {e}")
-                return None
-
-            soup = BeautifulSoup(response.text, "lxml")
-            await asyncio.sleep(random.uniform(5, 15))
-
-            return self._extract_property_details(soup, property_url)
-
-    def _extract_property_details(
-        self, soup: BeautifulSoup, property_url: str
-    ) -> dict | None:
-        json_data = self._extract_utag_data(soup)
-        if not json_data:
-            return None
-
-        return {
-            **self._extract_characteristics(json_data),
-            **self._extract_condition(json_data),
-            "price": Money(amount=self._extract_price(json_data), currency="EUR"),
-            "agency_name": self._extract_agency_name(json_data),
-            **self._extract_metadata(soup, property_url),
-            "is_illegally_occupied": self._extract_is_illegally_occupied(soup),
-            "id": self._extract_id(json_data),
-        }
-
-    def _extract_id(self, data: dict) -> str:
-        return data.get("ad", {}).get("id", "")
-
-    def _extract_utag_data(self, soup: BeautifulSoup) -> dict | None:
-        regex = re.compile(r"var\s*utag_data\s*=\s*(\{.*?\});", re.DOTALL)
-        script_text = regex.search(soup.prettify())
-        if not script_text:
-            self.logger.error("❌ No script text found")
-            return None
-
-        json_string = script_text.group(1)
+    async def _fetch_property_details(
+        self, session, property_url, location_id: str | None = None
+    ):
         try:
-            return json.loads(json_string)
-        except json.JSONDecodeError as e:
-            self.logger.error(f"❌ JSON decode error: {e}")
+            response = await self._get(
+                session, f"{self.base_url}{property_url}", location_id
+            )
+            response.raise_for_status()
+        except Exception as e:
+            self.logger.error("Failed to fetch {}: {}", property_url, e)
             return None
+        self.pages_total.labels(kind="detail").inc()
 
-    def _extract_is_illegally_occupied(self, soup: BeautifulSoup) -> bool:
-        return soup.find("span", string="Ocupada ilegalmente") is not None
-
-    def _extract_characteristics(self, data: dict) -> dict:
-        characteristics = data.get("ad", {}).get("characteristics", {})
-        return {
-            "rooms": characteristics.get("roomNumber") or 0,
-            "bathrooms": characteristics.get("bathNumber") or 0,
-            "square_meters": characteristics.get("constructedArea") or 0,
-            "has_garage": self._str_to_bool(characteristics.get("hasParking", "")),
-            "has_garden": self._str_to_bool(characteristics.get("hasGarden", "")),
-            "has_pool": self._str_to_bool(characteristics.get("hasSwimmingPool", "")),
-            "has_terrace": self._str_to_bool(characteristics.get("hasTerrace", "")),
-        }
-
-    def _extract_condition(self, data: dict) -> dict:
-        condition = data.get("ad", {}).get("condition", {})
-        return {
-            "is_new_development": self._str_to_bool(
-                condition.get("isNewDevelopment", "")
-            ),
-            "needs_renovation": self._str_to_bool(
-                condition.get("isNeedsRenovating", "")
-            ),
-            "is_in_good_condition": self._str_to_bool(
-                condition.get("isGoodCondition", "")
-            ),
-        }
-
-    def _extract_price(self, data: dict) -> float:
-        return float(data.get("ad", {}).get("price", 0))
-
-    def _extract_agency_name(self, data: dict) -> str:
-        return data.get("agency", {}).get("name", "")
-
-    def _extract_metadata(self, soup: BeautifulSoup, property_url: str) -> dict:
-        return {
-            "title": self._extract_title(soup),
-            "description": self._extract_description(soup),
-            "address": self._extract_address(soup),
-            "location": self._extract_location(soup),
-            "url": f"{BASE_URL}{property_url}",
-        }
-
-    def _extract_title(self, soup: BeautifulSoup) -> str:
-        title_tag = soup.find("span", class_="main-info__title-main")
-        return title_tag.get_text(strip=True) if title_tag else ""
-
-    def _extract_description(self, soup: BeautifulSoup) -> str:
-        desc_tag = soup.find("div", class_="ad-comment")
-        return desc_tag.get_text(strip=True) if desc_tag else ""
-
-    def _extract_address(self, soup: BeautifulSoup) -> str:
-        address_tag = soup.find("span", class_="main-info__address-text")
-        return address_tag.get_text(strip=True) if address_tag else ""
+        return await self._parse(
+            self.parser.parse_timed, response.content, property_url, response.encoding
+        )
 
-    def _extract_location(self, soup: BeautifulSoup) -> str:
-        span = soup.find("span", class_="main-info__title-minor")
-        return span.get_text(strip=True) if span else ""
+    async def _get(self, session, url: str, location_id: str | None):
+        return await self.fetcher.fetch(
+            url, lambda: self._send(session, url, location_id)
+        )
 
-    def _str_to_bool(self, value: str) -> bool:
-        return value == "1"
+    async def _send(self, session, url: str, location_id: str | None):
+        waiting_since = time.perf_counter()
+        async with self.semaphore.slot(location_id):
+            start = time.perf_counter()
+            self.slot_wait_seconds.observe(start - waiting_since)
+            try:
+                response = await session.get(url)
+            except Exception:
+                self.fetch_seconds.labels(status="error").observe(
+                    time.perf_counter() - start
+                )
+                raise
+        self.fetch_seconds.labels(status=response.status_code).observe(
+            time.perf_counter() - start
+        )
+        return response
+
+    async def _parse(self, parse, *args):
+        """
+        Runs a CPU-bound parse in the process pool when there is one.
+
+        Parsers take raw bytes and return plain dicts, so only those cross the
+        process boundary, along with what they logged, logged again here.
+        `parse` returns the result and its stage timings.
+        """
+        if self.executor is None:
+            result, timings = parse(*args)
+        else:
+            outcome, records = await asyncio.get_running_loop().run_in_executor(
+                self.executor, run_capturing_logs, parse, *args
+            )
+            self.logger.replay(records)
+            result, timings = outcome
+        for stage, seconds in timings.items():
+            self.stage_seconds.labels(stage=stage).observe(seconds)
+        return result
 
     async def run(self):
         start_time = time.time()
@@ -149,67 +240,578 @@ class IdealistaScraper:
             self.logger.error("❌ No locations found in the database")
             return
         self.logger.info(f"✅ Found {len(locations)} locations in the database")
+        if self.checkpoint is not None and self.resume:
+            locations = [
+                location
+                for location in locations
+                if not self.checkpoint.is_completed(location.get("id"))
+            ]
+            self.logger.info(f"⏯️ Resuming, {len(locations)} locations left")
+            if not locations:
+                return
+        elif self.checkpoint is not None:
+            self.checkpoint.reset()
+
+        self.progress = CrawlProgress(self.logger, locations)
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        for index, location in enumerate(locations):
+            # Biggest locations first, so the longest crawls don't start last.
+            priority = -(location.get("number_of_properties") or 0)
+            queue.put_nowait((priority, index, location))
+
+        workers_count = max(1, min(self.location_workers, len(locations)))
+        self.logger.info(f"👷 Crawling with {workers_count} location workers")
+        if self.work_queue is not None:
+            await asyncio.to_thread(
+                self.work_queue.publish,
+                self.cycle_id,
+                [
+                    (location.get("id"), -(location.get("number_of_properties") or 0))
+                    for location in locations
+                ],
+            )
+            self.logger.info(
+                f"📬 Sharing cycle {self.cycle_id} as worker {self.worker_id}"
+            )
 
-        async with AsyncSession(impersonate="chrome") as session:
-            for location in locations:
-                url = f"https://www.idealista.com{location.get('path').replace('mapa', '')}"
-                self.logger.info(f"▶️ Starting to scrape: {url}")
-                await self.scrape_page(url, session, location.get("id"))
-                self.logger.info(f"✅ Finished scraping: {url}")
-
-                if location != locations[-1]:
-                    sleep_time = random.uniform(5, 15)
-                    self.logger.info(
-                        f"💤 Sleeping for {sleep_time:.2f} seconds before next location..."
-                    )
-                    await asyncio.sleep(sleep_time)
+        if self.parse_workers > 0:
+            self.executor = ProcessPoolExecutor(
+                self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=capture_worker_logs,
+            )
+            self.logger.info(f"🧮 Parsing with {self.parse_workers} worker processes")
+
+        async with self._open_session() as session:
+            reporter = asyncio.create_task(self._report_progress())
+            checkpointer = asyncio.create_task(self._flush_checkpoint())
+            try:
+                await asyncio.gather(
+                    *[
+                        self._location_worker(queue, session)
+                        if self.work_queue is None
+                        else self._shared_location_worker(locations, session)
+                        for _ in range(workers_count)
+                    ]
+                )
+            finally:
+                reporter.cancel()
+                checkpointer.cancel()
+                if self.checkpoint is not None:
+                    self.checkpoint.flush()
+                if self.executor is not None:
+                    executor, self.executor = self.executor, None
+                    # Joining the spawned workers would block the event loop.
+                    await asyncio.to_thread(executor.shutdown, cancel_futures=True)
 
         self.logger.info(
             f"✅ Scraping finished in {time.time() - start_time:.2f} seconds"
         )
 
-    async def scrape_page(self, url: str | None, session, location_id: str | None):
-        if url is None or location_id is None:
+    def _open_session(self):
+        pool = SessionPool(
+            self.logger, warmup_url=f"{self.base_url}/", fetcher=self.fetcher
+        )
+        if self.response_cache is None:
+            return pool
+        return CachingSession(self.response_cache, pool, replay=self.replay)
+
+    async def _location_worker(self, queue: asyncio.PriorityQueue, session):
+        while not queue.empty():
+            _, _, location = queue.get_nowait()
+            await self._crawl_location(location, session)
+
+    async def _shared_location_worker(self, locations: list[dict], session):
+        """Crawls the locations leased from the work queue until none is left."""
+        locations_by_id = {location.get("id"): location for location in locations}
+        while True:
+            location_id = await asyncio.to_thread(
+                self.work_queue.claim, self.cycle_id, self.worker_id
+            )
+            if location_id is None:
+                return
+            location = locations_by_id.get(location_id)
+            if location is None:
+                self.logger.error(f"❌ Leased unknown location {location_id}")
+                await asyncio.to_thread(
+                    self.work_queue.complete, self.cycle_id, self.worker_id, location_id
+                )
+                continue
+
+            crawl = asyncio.create_task(self._crawl_location(location, session))
+            lease = asyncio.create_task(self._keep_lease(location_id, crawl))
+            try:
+                await asyncio.wait({crawl})
+            except asyncio.CancelledError:
+                # Shutting down: hand the location over right away instead of
+                # letting it wait for the lease to expire.
+                crawl.cancel()
+                self.work_queue.release(self.cycle_id, self.worker_id, location_id)
+                raise
+            finally:
+                lease.cancel()
+            if not crawl.cancelled():
+                await asyncio.to_thread(
+                    self.work_queue.complete, self.cycle_id, self.worker_id, location_id
+                )
+
+    async def _keep_lease(self, location_id: str, crawl: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            alive = await asyncio.to_thread(
+                self.work_queue.heartbeat, self.cycle_id, self.worker_id, location_id
+            )
+            if not alive:
+                # Another worker owns the location now: stop crawling it twice.
+                self.logger.error(f"❌ Lost the lease on {location_id}, stopping")
+                crawl.cancel()
+                return
+
+    async def _crawl_location(self, location: dict, session):
+        location_id = location.get("id")
+        url = f"{self.base_url}{location.get('path').replace('mapa', '')}"
+        start_url, pending = url, []
+        if self.checkpoint is not None and self.resume:
+            start_url = self.checkpoint.resume_point(location_id, url)
+            pending = self.checkpoint.pending_links(location_id)
+            if start_url != url or pending:
+                self.logger.info(
+                    f"⏯️ Resuming {url} at {start_url or 'its pending links'}"
+                    f" with {len(pending)} pending links"
+                )
+        self.logger.info(f"▶️ Starting to scrape: {url}")
+        # Only a crawl from the first page to the last sees every listing: a
+        # failed or resumed one misses the pages read before or after.
+        complete = False
+        try:
+            await self.scrape_page(start_url, session, location_id, pending)
+        except Exception as e:
+            self.logger.error(f"❌ Error scraping {url}: {e}")
+        else:
+            if self.checkpoint is not None:
+                self.checkpoint.complete(location_id)
+            complete = start_url == url and not pending
+            if self.price_history is not None and complete:
+                self._detect_delisted(location_id)
+        seen = self._seen.pop(location_id, set())
+        saved = self._saved.pop(location_id, {})
+        self.logger.info(f"✅ Finished scraping: {url}")
+        if complete:
+            await self._refresh_location_stats(location_id, seen, saved)
+        self.progress.complete(location_id)
+
+    def _detect_delisted(self, location_id: str):
+        delisted = self.price_history.detect_delisted(
+            location_id, self._seen.get(location_id, ())
+        )
+        if len(delisted):
+            self.delisted_total.inc(len(delisted))
+            self.logger.info(f"📉 {len(delisted)} listings delisted from {location_id}")
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(PROGRESS_REPORT_INTERVAL)
+            self.progress.report()
+
+    async def _flush_checkpoint(self):
+        if self.checkpoint is None:
+            return
+        while True:
+            await asyncio.sleep(CHECKPOINT_FLUSH_INTERVAL)
+            self.checkpoint.flush()
+
+    async def scrape_page(
+        self,
+        url: str | None,
+        session,
+        location_id: str | None,
+        pending: list[dict] | None = None,
+    ):
+        """
+        Crawls every result page of a location starting at `url`.
+
+        Runs as a pipeline: a producer walks the result pages ahead of time
+        into a bounded queue of links, detail workers fetch and parse them,
+        and a writer stores the resulting rows in batches.
+
+        In list-only mode the producer writes a partial row per result card
+        and only queues the cards accepted by `detail_filter`, if any.
+
+        `pending` are cards whose detail page was queued by an interrupted
+        run; they are fetched first. `url` may then be None when every
+        result page was already read.
+        """
+        if location_id is None or (url is None and not pending):
             self.logger.error("❌ URL or location ID is None")
             return
-        self.logger.info(f"Scraping page: {url}")
-        r = await session.get(url)
-        soup = BeautifulSoup(r.text, "lxml")
 
-        property_links = await self._fetch_property_links(soup)
+        links: asyncio.Queue = asyncio.Queue(maxsize=LINK_QUEUE_SIZE)
+        rows: asyncio.Queue = asyncio.Queue()
+        writer = asyncio.create_task(self._write_properties(rows))
+        detail_workers = [
+            asyncio.create_task(self._consume_links(session, location_id, links, rows))
+            for _ in range(self.detail_workers)
+        ]
+        try:
+            try:
+                for card in pending or ():
+                    await links.put(card)
+                    self.queue_depth.labels(queue="links").inc()
+                await self._produce_links(url, session, location_id, links, rows)
+            except Exception:
+                # A failed page still lets the links already queued finish.
+                await self._drain_pipeline(links, rows, detail_workers, writer)
+                raise
+            await self._drain_pipeline(links, rows, detail_workers, writer)
+        except asyncio.CancelledError:
+            # The lease was lost or the run is stopping: the queued links are
+            # left pending, for the checkpoint or the location's new owner,
+            # instead of being fetched and saved by a crawl that must stop.
+            for task in (*detail_workers, writer):
+                task.cancel()
+            await asyncio.gather(*detail_workers, writer, return_exceptions=True)
+            raise
+        finally:
+            if self.listing_index is not None:
+                self.listing_index.flush()
+            if self.analytics_store is not None:
+                self.analytics_store.flush()
+            if self.price_history is not None:
+                self.price_history.flush()
+
+    async def _drain_pipeline(
+        self,
+        links: asyncio.Queue,
+        rows: asyncio.Queue,
+        detail_workers: list[asyncio.Task],
+        writer: asyncio.Task,
+    ):
+        """Lets the detail workers and the writer finish what was queued."""
+        for _ in detail_workers:
+            await links.put(None)
+        await asyncio.gather(*detail_workers, return_exceptions=True)
+        await rows.put(None)
+        await writer
+
+    async def _produce_links(
+        self,
+        url: str | None,
+        session,
+        location_id: str,
+        links: asyncio.Queue,
+        rows: asyncio.Queue,
+    ):
+        while url is not None:
+            self.logger.info("Scraping page: {}", url, sample="page")
+            r = await self._get(session, url, location_id)
+            # A failed page fails the location, which can then be resumed.
+            r.raise_for_status()
+            self.pages_total.labels(kind="result").inc()
+            page = await self._parse(
+                self.listing_parser.parse_timed, r.content, r.encoding
+            )
 
-        properties = await asyncio.gather(
-            *[self.get_property_data(session, link) for link in property_links]
-        )
+            cards = [card for card in page["cards"] if card["url"] is not None]
+            self._seen[location_id].update(
+                card["id"] for card in cards if card["id"] is not None
+            )
+            if self.list_only:
+                await self._put_partial_rows(cards, location_id, rows)
+
+            unchanged = 0
+            for card in cards:
+                if self.list_only and (
+                    self.detail_filter is None or not self.detail_filter(card)
+                ):
+                    if self.progress:
+                        self.progress.advance(location_id)
+                    continue
+                if self.listing_index is not None and not (
+                    self.listing_index.needs_details(card)
+                ):
+                    self.listing_index.touch(card["id"])
+                    if self.price_history is not None:
+                        # Its price is unchanged, but may not be logged yet.
+                        self.price_history.record(card["id"], card["price"])
+                    self.properties_skipped.inc()
+                    unchanged += 1
+                    if self.progress:
+                        self.progress.advance(location_id)
+                    continue
+                if self.checkpoint is not None:
+                    self.checkpoint.add_link(location_id, card)
+                await links.put(card)
+                self.queue_depth.labels(queue="links").inc()
+            if unchanged:
+                self.logger.debug("⏭️ Skipped {} unchanged listings", unchanged)
+            if self.progress:
+                self.progress.advance(location_id)
+
+            url = page["next_page"]
+            if self.checkpoint is not None:
+                self.checkpoint.page_done(location_id, url)
+            if url is None:
+                self.logger.debug("❌ No next page found")
+
+    async def _put_partial_rows(
+        self, cards: list[dict], location_id: str, rows: asyncio.Queue
+    ):
+        # The parser already falls back to the id in the card URL: without
+        # one, every such card would be upserted as the same "" row.
+        with self.stage_seconds.labels(stage="validate").time():
+            partial_rows, errors = PropertyRecord.validate_batch(
+                [self._card_to_details(card) for card in cards if card["id"]],
+                location_id,
+            )
+        for details, error in errors:
+            self.logger.debug("❌ Invalid result card {}: {}", details["url"], error)
+        for row in partial_rows:
+            await rows.put(row)
+        self.queue_depth.labels(queue="rows").inc(len(partial_rows))
 
-        valid_properties = [
-            {
-                **{k: v for k, v in p.model_dump().items() if k != "price"},
-                "price_amount": p.price.get_amount(),
-                "price_currency": p.price.get_currency(),
-                "location_id": location_id,
-            }
-            for p in properties
-            if p is not None
-        ]
+    def _card_to_details(self, card: dict) -> dict:
+        return {
+            "id": card["id"],
+            "price": {"amount": card["price"], "currency": "EUR"},
+            "title": card["title"],
+            "square_meters": card["square_meters"] or 0,
+            "rooms": card["rooms"] or 0,
+            "url": f"{self.base_url}{card['url']}",
+            "is_partial": True,
+        }
 
-        if valid_properties:
-            self.logger.info(
-                f"Saving {len(valid_properties)} properties to database..."
+    async def _consume_links(
+        self, session, location_id: str, links: asyncio.Queue, rows: asyncio.Queue
+    ):
+        while (card := await links.get()) is not None:
+            self.queue_depth.labels(queue="links").dec()
+            link = card["url"]
+            # A failing row is skipped: a dead worker would leave the
+            # producer blocked on the full links queue.
+            try:
+                row = await self.get_property_data(session, link, location_id)
+                if row is None and self.checkpoint is not None:
+                    # Nothing to save: retrying it on resume wouldn't help.
+                    self.checkpoint.links_done([CrawlCheckpoint.link_key(card)])
+                if row is not None and self.comparables is not None:
+                    self._score(row)
+                if row is not None and self.duplicates is not None:
+                    self._find_duplicates(row)
+            except Exception as e:
+                self.logger.error("❌ Error scraping property {}: {}", link, e)
+                row = None
+            if self.progress:
+                self.progress.advance(location_id)
+            if row is not None:
+                await rows.put(row)
+                self.queue_depth.labels(queue="rows").inc()
+
+    async def _write_properties(self, rows: asyncio.Queue):
+        batch: list[dict] = []
+        while True:
+            try:
+                row = await asyncio.wait_for(rows.get(), WRITE_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                # Nothing new for a while: don't hold rows back for a full batch.
+                if batch:
+                    await self._save_properties(batch)
+                    batch = []
+                continue
+            if row is None:
+                break
+            self.queue_depth.labels(queue="rows").dec()
+            batch.append(row)
+            if len(batch) >= WRITE_BATCH_SIZE:
+                await self._save_properties(batch)
+                batch = []
+
+        if batch:
+            await self._save_properties(batch)
+
+    async def _save_properties(self, batch: list[dict]):
+        # Partial rows only carry the card columns: they are written apart so
+        # a listing already stored keeps its detail columns, title and
+        # is_partial flag, and first, so a card never overwrites its own
+        # detail row.
+        partial = [row for row in batch if row["is_partial"]]
+        complete = [row for row in batch if not row["is_partial"]]
+        for rows, insert in (
+            (partial, self.database.insert_partial_properties),
+            (complete, self.database.insert_properties),
+        ):
+            if rows:
+                await self._save_batch(rows, insert)
+
+    async def _save_batch(self, batch: list[dict], insert: Callable):
+        self.logger.info(
+            "Saving {} properties to database...", len(batch), sample="batch"
+        )
+        self.write_batch_size.observe(len(batch))
+        try:
+            with self.write_seconds.time():
+                saved = await asyncio.to_thread(insert, batch)
+        except Exception as e:
+            self.logger.error(f"❌ Error saving properties: {e}")
+            return
+        # A failing batch is bisected, so only some of its rows may be saved.
+        batch = [row for row in batch if row["id"] in saved]
+        if self.listing_index is not None:
+            for row in batch:
+                # Partial rows never had their detail page fetched.
+                if not row["is_partial"]:
+                    self.listing_index.record(row["id"], row["price_amount"])
+        if self.checkpoint is not None:
+            # A card queued for its details is pending until they are saved.
+            self.checkpoint.links_done(
+                [row["id"] for row in batch if not row["is_partial"]]
+            )
+        if self.comparables is not None:
+            for row in batch:
+                self.comparables.add(row)
+        if self.analytics_store is not None and batch:
+            self.analytics_store.append(batch)
+        if self.price_history is not None:
+            for row in batch:
+                if self.price_history.record(row["id"], row["price_amount"]):
+                    self.price_changes_total.inc()
+        for row in batch:
+            # Complete rows are written after partial ones and win.
+            self._saved[row["location_id"]][row["id"]] = (
+                row["price_amount"],
+                row["square_meters"],
             )
-            self.database.insert_properties(valid_properties)
-            self.logger.info(f"✅ {len(valid_properties)} properties saved to database")
+        self.logger.info(
+            "✅ {} properties saved to database", len(batch), sample="batch_saved"
+        )
 
-        next_page_link = await self.get_next_page_link(soup)
-        await self.scrape_page(next_page_link, session, location_id)
+    def _find_duplicates(self, row: dict):
+        with self.stage_seconds.labels(stage="dedupe").time():
+            duplicates = self.duplicates.add(row)
+        if duplicates:
+            self.duplicates_total.inc()
+            self.logger.debug("🪞 {} duplicates {}", row["id"], duplicates)
+
+    def _score(self, row: dict):
+        """Compares a new row with its nearest comparables, alerting when cheap."""
+        with self.stage_seconds.labels(stage="score").time():
+            estimate = self.comparables.estimate(row)
+        if estimate is None or estimate["discount"] < self.alert_discount:
+            return
+        self.alerts_total.inc()
+        if self.alerts is not None:
+            self.alerts.emit(
+                {
+                    "id": row["id"],
+                    "url": row["url"],
+                    "location_id": row["location_id"],
+                    "price": row["price_amount"],
+                    "estimated_value": estimate["estimated_value"],
+                    "discount": estimate["discount"],
+                    "comparables": estimate["comparables"],
+                }
+            )
 
-    async def _fetch_property_links(self, soup: BeautifulSoup):
-        return [link.get("href") for link in soup.find_all("a", class_="item-link")]
+    async def _refresh_location_stats(
+        self, location_id: str | None, seen: set[str], saved: dict[str, tuple]
+    ):
+        """
+        Recomputes the aggregate row of a location once its crawl is over, so
+        the dashboard reads one precomputed row instead of the properties.
+        """
+        if location_id is None:
+            return
+        # Taken on the event loop: the detail workers keep adding to the
+        # duplicate index while the stats are computed in a thread.
+        duplicate_ids = (
+            self.duplicates.duplicate_ids() if self.duplicates is not None else set()
+        )
+        try:
+            stats = await asyncio.to_thread(
+                self._location_stats, location_id, seen, saved, duplicate_ids
+            )
+            if stats is not None:
+                await asyncio.to_thread(
+                    self.database.upsert_location_stats, [stats.as_dict()]
+                )
+        except Exception as e:
+            self.logger.error(f"❌ Error refreshing stats of {location_id}: {e}")
+
+    def _location_stats(
+        self,
+        location_id: str,
+        seen: set[str],
+        saved: dict[str, tuple],
+        duplicate_ids: set[str],
+    ) -> LocationStats | None:
+        """
+        Aggregates the listings on the result pages of the last crawl, `seen`,
+        from their latest stored rows, or from the rows `saved` in this run.
+        """
+        if self.analytics_store is not None:
+            # The snapshot also holds the listings skipped as unchanged, and
+            # those delisted since, which the seen ids leave out.
+            table = latest_snapshot(
+                self.analytics_store.load(
+                    columns=[
+                        "id",
+                        "price_amount",
+                        "square_meters",
+                        "location_id",
+                        "is_partial",
+                        "scrape_date",
+                    ],
+                    location_ids=[location_id],
+                )
+            )
+            table = table.filter(
+                pc.is_in(table.column("id"), value_set=pa.array(seen, pa.string()))
+            )
+        elif self.listing_index is not None:
+            # Listings skipped as unchanged weren't saved: without the
+            # analytics store their price and surface are unknown here.
+            return None
+        else:
+            table = pa.table(
+                {
+                    "id": list(saved),
+                    "price_amount": [price for price, _ in saved.values()],
+                    "square_meters": [surface for _, surface in saved.values()],
+                    "location_id": [location_id] * len(saved),
+                },
+                schema=pa.schema(
+                    [
+                        ("id", pa.string()),
+                        ("price_amount", pa.float64()),
+                        ("square_meters", pa.int64()),
+                        ("location_id", pa.string()),
+                    ]
+                ),
+            )
+        if duplicate_ids:
+            # A flat listed by several agencies counts once.
+            table = table.filter(
+                pc.invert(
+                    pc.is_in(
+                        table.column("id"),
+                        value_set=pa.array(duplicate_ids, pa.string()),
+                    )
+                )
+            )
+        if table.num_rows == 0:
+            return None
 
-    async def get_next_page_link(self, soup: BeautifulSoup) -> str | None:
-        next_li = soup.find("li", class_="next")
-        if next_li:
-            next_path = next_li.find("a").get("href")
-            return f"{BASE_URL}{next_path}"
-        self.logger.debug("❌ No next page found")
-        return None
+        metrics = location_metrics(table)
+        has_metrics = len(metrics.location_ids) > 0
+        return LocationStats(
+            location_id=location_id,
+            scraped_properties=table.num_rows,
+            mean_price=pc.mean(table.column("price_amount")).as_py() or 0.0,
+            mean_price_per_square_meter=(
+                float(metrics.means[0]) if has_metrics else 0.0
+            ),
+            median_price_per_square_meter=(
+                float(metrics.medians[0]) if has_metrics else 0.0
+            ),
+            std_price_per_square_meter=float(metrics.stds[0]) if has_metrics else 0.0,
+            updated_at=datetime.now(timezone.utc).isoformat(),
+        )
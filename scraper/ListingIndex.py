@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import time
+
+from constants.constants import LISTING_INDEX_PATH
+from core.Logger import Logger
+
+
+class ListingIndex:
+    """
+    Local index of known listings: ad id -> (last seen price, last seen time).
+
+    The whole index is loaded into a dict with a single query when opened, so
+    lookups on the crawl hot path never touch the disk. Changes are buffered
+    and written back in one transaction by `flush`.
+    """
+
+    def __init__(self, logger: Logger, path: str = LISTING_INDEX_PATH):
+        self.logger = logger
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            "id TEXT PRIMARY KEY, price REAL, last_seen REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.listings: dict[str, tuple[float | None, float]] = {
+            listing_id: (price, last_seen)
+            for listing_id, price, last_seen in self.connection.execute(
+                "SELECT id, price, last_seen FROM listings"
+            )
+        }
+        self._pending: dict[str, tuple[float | None, float]] = {}
+        self.logger.info(f"📇 Loaded {len(self.listings)} known listings from {path}")
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def needs_details(self, card: dict) -> bool:
+        """A card needs its detail page when the ad is new or its price changed."""
+        known = self.listings.get(card.get("id"))
+        if known is None or card.get("price") is None:
+            return True
+        return known[0] != card["price"]
+
+    def record(self, listing_id: str, price: float | None) -> None:
+        entry = (price, time.time())
+        self.listings[listing_id] = entry
+        self._pending[listing_id] = entry
+
+    def touch(self, listing_id: str) -> None:
+        """Marks a known listing as seen again, keeping its price."""
+        price, _ = self.listings[listing_id]
+        self.record(listing_id, price)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO listings (id, price, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                "price = excluded.price, last_seen = excluded.last_seen",
+                [(key, price, seen) for key, (price, seen) in self._pending.items()],
+            )
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
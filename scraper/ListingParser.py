@@ -0,0 +1,103 @@
+import re
+import time
+
+from lxml import etree
+
+from constants.constants import BASE_URL
+
+AD_ID_REGEX = re.compile(r"/inmueble/(\d+)")
+NON_DIGITS_REGEX = re.compile(r"\D")
+ROOMS_REGEX = re.compile(r"(\d+)\s*hab")
+SQUARE_METERS_REGEX = re.compile(r"([\d.]+)\s*m²")
+ITEM_LINKS_XPATH = etree.XPath(
+    "//a[contains(concat(' ', normalize-space(@class), ' '), ' item-link ')]"
+)
+CARD_XPATH = etree.XPath("ancestor::article[1]")
+PRICE_XPATH = etree.XPath(
+    "string(.//span[contains(concat(' ', normalize-space(@class), ' '), "
+    "' item-price ')][1])"
+)
+DETAILS_XPATH = etree.XPath(
+    ".//span[contains(concat(' ', normalize-space(@class), ' '), ' item-detail ')]"
+)
+NEXT_PAGE_XPATH = etree.XPath(
+    "(//li[contains(concat(' ', normalize-space(@class), ' '), ' next ')]//a/@href)[1]"
+)
+
+
+class ListingParser:
+    """
+    Extracts the result cards and the next page link from a search result page.
+
+    Each card is a plain dict with the ad `id`, its detail `url` path, the
+    `title` and the `price`, `rooms` and `square_meters` shown on the card
+    (None when they can't be read). `parse_timed` also
+    reports the seconds spent building the tree ("parse") and reading the
+    cards ("extract").
+    """
+
+    def __init__(self, base_url: str = BASE_URL):
+        self.base_url = base_url
+
+    def parse(self, content: bytes, encoding: str | None = "utf-8") -> dict:
+        return self.parse_timed(content, encoding)[0]
+
+    def parse_timed(
+        self, content: bytes, encoding: str | None = "utf-8"
+    ) -> tuple[dict, dict[str, float]]:
+        start = time.perf_counter()
+        tree = etree.fromstring(
+            content.decode(encoding or "utf-8", errors="replace"), etree.HTMLParser()
+        )
+        tree_end = time.perf_counter()
+        if tree is None:
+            return {"cards": [], "next_page": None}, {"parse": tree_end - start}
+
+        next_page = NEXT_PAGE_XPATH(tree)
+        page = {
+            "cards": [self._parse_card(link) for link in ITEM_LINKS_XPATH(tree)],
+            "next_page": f"{self.base_url}{next_page[0]}" if next_page else None,
+        }
+        return page, {
+            "parse": tree_end - start,
+            "extract": time.perf_counter() - tree_end,
+        }
+
+    def _parse_card(self, link) -> dict:
+        url = link.get("href")
+        cards = CARD_XPATH(link)
+        card = cards[0] if cards else None
+        details = (
+            " ".join(span.xpath("string()") for span in DETAILS_XPATH(card))
+            if card is not None
+            else ""
+        )
+        return {
+            "id": self._extract_id(card, url),
+            "url": url,
+            "title": (link.get("title") or link.xpath("string()")).strip(),
+            "price": self._extract_price(card),
+            "rooms": self._extract_number(ROOMS_REGEX, details),
+            "square_meters": self._extract_number(SQUARE_METERS_REGEX, details),
+        }
+
+    def _extract_id(self, card, url: str | None) -> str | None:
+        if card is not None:
+            ad_id = card.get("data-element-id") or card.get("data-adid")
+            if ad_id:
+                return ad_id
+        match = AD_ID_REGEX.search(url or "")
+        return match.group(1) if match else None
+
+    def _extract_price(self, card) -> float | None:
+        if card is None:
+            return None
+        digits = NON_DIGITS_REGEX.sub("", PRICE_XPATH(card))
+        return float(digits) if digits else None
+
+    def _extract_number(self, regex: re.Pattern, text: str) -> int | None:
+        match = regex.search(text)
+        if not match:
+            return None
+        digits = NON_DIGITS_REGEX.sub("", match.group(1))
+        return int(digits) if digits else None
@@ -0,0 +1,152 @@
+import json
+import re
+import time
+
+from lxml import etree
+
+from constants.constants import BASE_URL
+from core.Logger import Logger
+
+UTAG_DATA_REGEX = re.compile(rb"var\s*utag_data\s*=\s*(\{.*?\});", re.DOTALL)
+
+
+def _first_by_class(tag: str, class_name: str) -> etree.XPath:
+    return etree.XPath(
+        f"(//{tag}[contains(concat(' ', normalize-space(@class), ' '), "
+        f"' {class_name} ')])[1]"
+    )
+
+
+TITLE_XPATH = _first_by_class("span", "main-info__title-main")
+DESCRIPTION_XPATH = _first_by_class("div", "ad-comment")
+ADDRESS_XPATH = _first_by_class("span", "main-info__address-text")
+LOCATION_XPATH = _first_by_class("span", "main-info__title-minor")
+ILLEGALLY_OCCUPIED_XPATH = etree.XPath(
+    "boolean(//span[count(node()) = 1 and . = 'Ocupada ilegalmente'])"
+)
+# Same strings BeautifulSoup's get_text() visits: no comments, scripts or styles.
+TEXT_XPATH = etree.XPath(
+    "descendant::text()[not(parent::script) and not(parent::style)]"
+)
+
+
+class PropertyParser:
+    """
+    Extracts property fields from a raw detail page.
+
+    The utag_data JSON is located directly in the response bytes and the DOM is
+    only built once, to read the handful of fields that are not part of it.
+    Outputs plain dicts so the result can be validated into a Property.
+    `parse_timed` also reports the seconds spent building the tree ("parse")
+    and reading fields ("extract").
+    """
+
+    def __init__(self, logger: Logger, base_url: str = BASE_URL):
+        self.logger = logger
+        self.base_url = base_url
+
+    def parse(
+        self, content: bytes, property_url: str, encoding: str | None = "utf-8"
+    ) -> dict | None:
+        return self.parse_timed(content, property_url, encoding)[0]
+
+    def parse_timed(
+        self, content: bytes, property_url: str, encoding: str | None = "utf-8"
+    ) -> tuple[dict | None, dict[str, float]]:
+        start = time.perf_counter()
+        # Responses without a declared charset report None.
+        encoding = encoding or "utf-8"
+        json_data = self._extract_utag_data(content, encoding)
+        if not json_data:
+            return None, {"extract": time.perf_counter() - start}
+
+        tree_start = time.perf_counter()
+        tree = etree.fromstring(
+            content.decode(encoding, errors="replace"), etree.HTMLParser()
+        )
+        tree_end = time.perf_counter()
+
+        details = {
+            **self._extract_characteristics(json_data),
+            **self._extract_condition(json_data),
+            "price": {"amount": self._extract_price(json_data), "currency": "EUR"},
+            "agency_name": self._extract_agency_name(json_data),
+            **self._extract_metadata(tree, property_url),
+            "is_illegally_occupied": self._extract_is_illegally_occupied(tree),
+            "id": self._extract_id(json_data),
+        }
+        return details, {
+            "parse": tree_end - tree_start,
+            "extract": (tree_start - start) + (time.perf_counter() - tree_end),
+        }
+
+    def _extract_utag_data(self, content: bytes, encoding: str) -> dict | None:
+        match = UTAG_DATA_REGEX.search(content)
+        if not match:
+            self.logger.error("❌ No script text found")
+            return None
+
+        try:
+            # json.loads only detects the UTF encodings on bytes.
+            return json.loads(match.group(1).decode(encoding, errors="replace"))
+        except json.JSONDecodeError as e:
+            self.logger.error(f"❌ JSON decode error: {e}")
+            return None
+
+    def _extract_id(self, data: dict) -> str:
+        return data.get("ad", {}).get("id", "")
+
+    def _extract_characteristics(self, data: dict) -> dict:
+        characteristics = data.get("ad", {}).get("characteristics", {})
+        return {
+            "rooms": characteristics.get("roomNumber") or 0,
+            "bathrooms": characteristics.get("bathNumber") or 0,
+            "square_meters": characteristics.get("constructedArea") or 0,
+            "has_garage": self._str_to_bool(characteristics.get("hasParking", "")),
+            "has_garden": self._str_to_bool(characteristics.get("hasGarden", "")),
+            "has_pool": self._str_to_bool(characteristics.get("hasSwimmingPool", "")),
+            "has_terrace": self._str_to_bool(characteristics.get("hasTerrace", "")),
+        }
+
+    def _extract_condition(self, data: dict) -> dict:
+        condition = data.get("ad", {}).get("condition", {})
+        return {
+            "is_new_development": self._str_to_bool(
+                condition.get("isNewDevelopment", "")
+            ),
+            "needs_renovation": self._str_to_bool(
+                condition.get("isNeedsRenovating", "")
+            ),
+            "is_in_good_condition": self._str_to_bool(
+                condition.get("isGoodCondition", "")
+            ),
+        }
+
+    def _extract_price(self, data: dict) -> float:
+        return float(data.get("ad", {}).get("price", 0))
+
+    def _extract_agency_name(self, data: dict) -> str:
+        return data.get("agency", {}).get("name", "")
+
+    def _extract_metadata(self, tree, property_url: str) -> dict:
+        return {
+            "title": self._text_of(tree, TITLE_XPATH),
+            "description": self._text_of(tree, DESCRIPTION_XPATH),
+            "address": self._text_of(tree, ADDRESS_XPATH),
+            "location": self._text_of(tree, LOCATION_XPATH),
+            "url": f"{self.base_url}{property_url}",
+        }
+
+    def _extract_is_illegally_occupied(self, tree) -> bool:
+        return tree is not None and ILLEGALLY_OCCUPIED_XPATH(tree)
+
+    def _text_of(self, tree, xpath: etree.XPath) -> str:
+        if tree is None:
+            return ""
+        elements = xpath(tree)
+        if not elements:
+            return ""
+        return "".join(text.strip() for text in TEXT_XPATH(elements[0]))
+
+    def _str_to_bool(self, value: str) -> bool:
+        return value == "1"
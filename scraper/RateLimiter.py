@@ -0,0 +1,86 @@
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from constants.constants import RATE_LIMIT_JITTER, REQUESTS_PER_SECOND
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    capacity: float
+    tokens: float = field(default=0.0)
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def reserve(self, cost: float) -> float:
+        """Takes `cost` tokens and returns how long the caller must wait for them."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        self.tokens -= cost
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Per-host token bucket shared by the scrapers.
+
+    Each call to `acquire` reserves a slot in the host's schedule and sleeps
+    until it is due, so callers should acquire before taking any concurrency
+    slot. Jitter makes a request cost between 1 and 1 + jitter tokens: gaps
+    vary randomly but the configured rate is never exceeded. An infinite rate
+    disables limiting.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = REQUESTS_PER_SECOND,
+        jitter: float = RATE_LIMIT_JITTER,
+        burst: int = 1,
+    ):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be greater than 0")
+        self.requests_per_second = requests_per_second
+        self.jitter = jitter
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def rate(self, host: str) -> float:
+        """Current requests per second allowed to `host`."""
+        bucket = self._buckets.get(host)
+        return self.requests_per_second if bucket is None else bucket.rate
+
+    def set_rate(self, host: str, requests_per_second: float) -> None:
+        """Changes the rate of one host, e.g. to back off when it blocks us."""
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be greater than 0")
+        bucket = self._bucket(host)
+        # Settle the tokens earned at the old rate before switching.
+        bucket.reserve(0)
+        bucket.rate = requests_per_second
+
+    async def acquire(self, url: str) -> None:
+        if math.isinf(self.requests_per_second):
+            return
+        delay = self._reserve(urlsplit(url).netloc)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _reserve(self, host: str) -> float:
+        return self._bucket(host).reserve(1 + random.uniform(0, self.jitter))
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(
+                rate=self.requests_per_second,
+                capacity=self.burst,
+                tokens=self.burst,
+            )
+            self._buckets[host] = bucket
+        return bucket
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from curl_cffi.requests.exceptions import HTTPError
+
+from constants.constants import RESPONSE_CACHE_DIR, RESPONSE_CACHE_MAX_BYTES
+from core.Logger import Logger
+
+
+@dataclass
+class CachedResponse:
+    """The subset of the curl_cffi Response interface the scrapers rely on."""
+
+    url: str
+    status_code: int
+    content: bytes
+    encoding: str = "utf-8"
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HTTPError(f"HTTP Error {self.status_code}: {self.url}", 0, self)
+
+
+class ResponseCache:
+    """
+    On-disk cache of successful responses, keyed by URL and fetch date.
+
+    Bodies are zlib-compressed and stored once per sha256 digest of their
+    content, so a page that did not change between two days costs a single
+    blob. An SQLite index maps (url, fetch_date) to a digest and tracks when
+    each blob was last read; once the blobs exceed `max_bytes` the least
+    recently used ones are evicted together with their index entries.
+
+    Reads and writes block on SQLite, the disk and zlib, so the scrapers
+    call them from worker threads; the index is shared under a lock.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        directory: str = RESPONSE_CACHE_DIR,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+    ):
+        self.logger = logger
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        self.connection = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"), check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT NOT NULL,
+                fetch_date TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                encoding TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (url, fetch_date)
+            );
+            CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+            """
+        )
+        self.total_bytes = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+    @staticmethod
+    def today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def get(self, url: str, fetch_date: str | None = None) -> CachedResponse | None:
+        """
+        Returns the response stored for `url` on `fetch_date`, or the most
+        recent one when no date is given.
+        """
+        with self._lock:
+            if fetch_date is None:
+                row = self.connection.execute(
+                    "SELECT status_code, encoding, digest FROM entries WHERE url = ? "
+                    "ORDER BY fetch_date DESC LIMIT 1",
+                    (url,),
+                ).fetchone()
+            else:
+                row = self.connection.execute(
+                    "SELECT status_code, encoding, digest FROM entries "
+                    "WHERE url = ? AND fetch_date = ?",
+                    (url, fetch_date),
+                ).fetchone()
+        if row is None:
+            return None
+
+        status_code, encoding, digest = row
+        try:
+            with open(self._blob_path(digest), "rb") as blob:
+                content = zlib.decompress(blob.read())
+        except (OSError, zlib.error) as e:
+            self.logger.warning(f"⚠️ Dropping unreadable cache blob {digest}: {e}")
+            with self._lock:
+                self._delete_blobs([digest])
+            return None
+
+        with self._lock, self.connection:
+            self.connection.execute(
+                "UPDATE blobs SET last_access = ? WHERE digest = ?",
+                (time.time(), digest),
+            )
+        return CachedResponse(url, status_code, content, encoding)
+
+    def put(self, url: str, response) -> None:
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        now = time.time()
+        with self._lock:
+            with self.connection:
+                known = self.connection.execute(
+                    "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+                ).fetchone()
+                if known is None:
+                    compressed = zlib.compress(content)
+                    path = self._blob_path(digest)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "wb") as blob:
+                        blob.write(compressed)
+                    self.connection.execute(
+                        "INSERT INTO blobs (digest, size, last_access) VALUES (?, ?, ?)",
+                        (digest, len(compressed), now),
+                    )
+                    self.total_bytes += len(compressed)
+                else:
+                    self.connection.execute(
+                        "UPDATE blobs SET last_access = ? WHERE digest = ?",
+                        (now, digest),
+                    )
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(url, fetch_date, status_code, encoding, digest) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        url,
+                        self.today(),
+                        response.status_code,
+                        response.encoding or "utf-8",
+                        digest,
+                    ),
+                )
+
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+
+    def _evict(self) -> None:
+        evicted = []
+        excess = self.total_bytes - self.max_bytes
+        for digest, size in self.connection.execute(
+            "SELECT digest, size FROM blobs ORDER BY last_access"
+        ):
+            if excess <= 0:
+                break
+            evicted.append(digest)
+            excess -= size
+        self._delete_blobs(evicted)
+        self.logger.debug(f"🧹 Evicted {len(evicted)} blobs from the response cache")
+
+    def _delete_blobs(self, digests: list[str]) -> None:
+        with self.connection:
+            for digest in digests:
+                size = self.connection.execute(
+                    "SELECT size FROM blobs WHERE digest = ?", (digest,)
+                ).fetchone()
+                self.connection.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self.connection.execute(
+                    "DELETE FROM entries WHERE digest = ?", (digest,)
+                )
+                if size is not None:
+                    self.total_bytes -= size[0]
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], digest)
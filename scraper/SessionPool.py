@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+
+from curl_cffi.requests import AsyncSession
+
+from constants.constants import BASE_URL, SESSION_POOL_SIZE, SESSION_PROFILES
+from core.Logger import Logger
+from scraper.Fetcher import BlockedError, Fetcher, is_blocked
+
+
+@dataclass
+class PooledSession:
+    profile: str
+    session: AsyncSession
+    in_flight: int = 0
+    warmed: bool = False
+    retired: bool = False
+    warming: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class SessionPool:
+    """
+    Drop-in replacement for AsyncSession that spreads requests over several.
+
+    Each session impersonates its own browser profile and keeps its own
+    cookie jar and keep-alive connections. Requests go to the session with
+    the fewest requests in flight. A new session first loads `warmup_url`,
+    as a browser landing on the site would, to collect its cookies; with a
+    `fetcher` that request is rate limited and its blocks are counted like
+    any other. A session that gets a block or captcha response, warm-up
+    included, is retired, closed once its requests finish, and replaced by
+    a fresh one with the next profile.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        size: int = SESSION_POOL_SIZE,
+        profiles: tuple[str, ...] = SESSION_PROFILES,
+        warmup_url: str | None = BASE_URL,
+        fetcher: Fetcher | None = None,
+        **session_kwargs,
+    ):
+        if size < 1:
+            raise ValueError("SessionPool size must be at least 1")
+        self.logger = logger
+        self.size = size
+        self.warmup_url = warmup_url
+        self.fetcher = fetcher
+        self.session_kwargs = session_kwargs
+        self._profiles = itertools.cycle(profiles)
+        self.sessions: list[PooledSession] = []
+        self.recycled = 0
+
+    async def __aenter__(self):
+        self.sessions = [self._new_session() for _ in range(self.size)]
+        return self
+
+    async def __aexit__(self, *args):
+        await asyncio.gather(
+            *(pooled.session.close() for pooled in self.sessions),
+            return_exceptions=True,
+        )
+        self.sessions = []
+
+    async def get(self, url: str, **kwargs):
+        pooled = min(self.sessions, key=lambda pooled: pooled.in_flight)
+        pooled.in_flight += 1
+        try:
+            if not pooled.warmed:
+                await self._warm_up(pooled)
+            response = await pooled.session.get(url, **kwargs)
+        finally:
+            pooled.in_flight -= 1
+            if pooled.retired and not pooled.in_flight:
+                await pooled.session.close()
+        if is_blocked(response):
+            await self._recycle(pooled)
+        return response
+
+    def _new_session(self) -> PooledSession:
+        profile = next(self._profiles)
+        return PooledSession(
+            profile, AsyncSession(impersonate=profile, **self.session_kwargs)
+        )
+
+    async def _warm_up(self, pooled: PooledSession) -> None:
+        async with pooled.warming:
+            if pooled.warmed:
+                return
+            if self.warmup_url is not None:
+                try:
+                    response = await self._send_warm_up(pooled)
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Warm-up of {pooled.profile} failed: {e}")
+                else:
+                    if is_blocked(response):
+                        # The request that needed it fails and is retried
+                        # by its Fetcher on a fresh session, after a backoff.
+                        await self._recycle(pooled)
+                        raise BlockedError(f"Warm-up of {pooled.profile} blocked")
+            pooled.warmed = True
+
+    async def _send_warm_up(self, pooled: PooledSession):
+        if self.fetcher is None:
+            return await pooled.session.get(self.warmup_url)
+        return await self.fetcher.send_once(
+            self.warmup_url, lambda: pooled.session.get(self.warmup_url)
+        )
+
+    async def _recycle(self, pooled: PooledSession) -> None:
+        if pooled.retired:
+            return
+        pooled.retired = True
+        replacement = self._new_session()
+        self.sessions[self.sessions.index(pooled)] = replacement
+        self.recycled += 1
+        self.logger.warning(
+            f"♻️ Session {pooled.profile} was blocked,"
+            f" replaced by a fresh {replacement.profile} one"
+        )
+        if not pooled.in_flight:
+            await pooled.session.close()
@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import threading
+import time
+
+from constants.constants import (
+    WORK_LEASE_SECONDS,
+    WORK_MAX_ATTEMPTS,
+    WORK_QUEUE_PATH,
+)
+from core.Logger import Logger
+from scraper.WorkQueue import WorkQueue
+
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    WorkQueue on a SQLite file shared by the workers, e.g. through a volume
+    mounted into every container of the same host.
+
+    Claims run in `BEGIN IMMEDIATE` transactions, so SQLite's file lock
+    serialises them across processes and two workers never lease the same
+    location. A location claimed `max_attempts` times without completing
+    (it keeps killing its workers) is marked failed instead of retried.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        path: str = WORK_QUEUE_PATH,
+        lease_seconds: float = WORK_LEASE_SECONDS,
+        max_attempts: int = WORK_MAX_ATTEMPTS,
+    ):
+        super().__init__(lease_seconds)
+        self.logger = logger
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly where needed.
+        self.connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS work ("
+                "cycle_id TEXT NOT NULL, location_id TEXT NOT NULL, "
+                "priority REAL NOT NULL, status TEXT NOT NULL, worker_id TEXT, "
+                "lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (cycle_id, location_id)"
+                ") WITHOUT ROWID"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS work_by_status "
+                "ON work (cycle_id, status, priority)"
+            )
+
+    def publish(self, cycle_id: str, locations: list[tuple[str, float]]) -> None:
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO work (cycle_id, location_id, priority, status) "
+                    "VALUES (?, ?, ?, 'pending')",
+                    [
+                        (cycle_id, location_id, priority)
+                        for location_id, priority in locations
+                    ],
+                )
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def claim(self, cycle_id: str, worker_id: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._fail_exhausted(cycle_id, now)
+                row = self.connection.execute(
+                    "SELECT location_id FROM work WHERE cycle_id = ? AND ("
+                    "status = 'pending' OR (status = 'leased' AND lease_expires < ?)"
+                    ") ORDER BY priority LIMIT 1",
+                    (cycle_id, now),
+                ).fetchone()
+                if row is not None:
+                    self.connection.execute(
+                        "UPDATE work SET status = 'leased', worker_id = ?, "
+                        "lease_expires = ?, attempts = attempts + 1 "
+                        "WHERE cycle_id = ? AND location_id = ?",
+                        (worker_id, now + self.lease_seconds, cycle_id, row[0]),
+                    )
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+        return row[0] if row is not None else None
+
+    def heartbeat(self, cycle_id: str, worker_id: str, location_id: str) -> bool:
+        with self._lock:
+            cursor = self.connection.execute(
+                "UPDATE work SET lease_expires = ? WHERE cycle_id = ? "
+                "AND location_id = ? AND worker_id = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, cycle_id, location_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, cycle_id: str, worker_id: str, location_id: str) -> None:
+        self._finish(cycle_id, worker_id, location_id, "done")
+
+    def release(self, cycle_id: str, worker_id: str, location_id: str) -> None:
+        self._finish(cycle_id, worker_id, location_id, "pending")
+
+    def remaining(self, cycle_id: str) -> int:
+        with self._lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM work WHERE cycle_id = ? "
+                "AND status IN ('pending', 'leased')",
+                (cycle_id,),
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+
+    def _finish(
+        self, cycle_id: str, worker_id: str, location_id: str, status: str
+    ) -> None:
+        # Only the lease holder may finish a location: a worker that lost
+        # its lease must not undo the work of the one that took over.
+        with self._lock:
+            self.connection.execute(
+                "UPDATE work SET status = ?, worker_id = NULL, lease_expires = NULL "
+                "WHERE cycle_id = ? AND location_id = ? AND worker_id = ? "
+                "AND status = 'leased'",
+                (status, cycle_id, location_id, worker_id),
+            )
+
+    def _fail_exhausted(self, cycle_id: str, now: float) -> None:
+        for (location_id,) in self.connection.execute(
+            "UPDATE work SET status = 'failed' WHERE cycle_id = ? "
+            "AND status = 'leased' AND lease_expires < ? AND attempts >= ? "
+            "RETURNING location_id",
+            (cycle_id, now, self.max_attempts),
+        ).fetchall():
+            self.logger.error(
+                f"❌ Giving up on location {location_id} after {self.max_attempts} attempts"
+            )
@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+
+
+class WorkQueue(ABC):
+    """
+    Queue of locations shared by every scraper worker of a crawl cycle.
+
+    A worker claims a location with a lease of `lease_seconds` and keeps it
+    alive with `heartbeat` while crawling. A location whose lease expires
+    (its worker died) is handed to the next worker that claims; one marked
+    done is never handed out again within the same cycle.
+    """
+
+    def __init__(self, lease_seconds: float):
+        self.lease_seconds = lease_seconds
+
+    @abstractmethod
+    def publish(self, cycle_id: str, locations: list[tuple[str, float]]) -> None:
+        """
+        Adds (location id, priority) pairs to the cycle, lowest priority
+        first. Locations already in the cycle are left untouched, so every
+        worker can publish the same list.
+        """
+
+    @abstractmethod
+    def claim(self, cycle_id: str, worker_id: str) -> str | None:
+        """Leases the next available location, or None when there is none left."""
+
+    @abstractmethod
+    def heartbeat(self, cycle_id: str, worker_id: str, location_id: str) -> bool:
+        """Extends a lease. False means it expired and was handed to someone else."""
+
+    @abstractmethod
+    def complete(self, cycle_id: str, worker_id: str, location_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def release(self, cycle_id: str, worker_id: str, location_id: str) -> None:
+        """Gives a location back so another worker can claim it right away."""
+
+    @abstractmethod
+    def remaining(self, cycle_id: str) -> int:
+        """Locations of the cycle not done yet, leased ones included."""
+
+    def close(self) -> None:
+        pass
@@ -1,21 +1,306 @@
+import argparse
 import asyncio
+import os
+import socket
 
+from benchmarks.fake_database import InMemoryDatabase
+from constants.constants import (
+    ALERT_DISCOUNT,
+    ANALYTICS_DIR,
+    CHECKPOINT_PATH,
+    LISTING_INDEX_PATH,
+    LOCATION_WORKERS,
+    MAX_CONCURRENT_REQUESTS,
+    METRICS_DUMP_INTERVAL,
+    PARSE_WORKERS,
+    PRICE_HISTORY_DIR,
+    RESPONSE_CACHE_DIR,
+)
+from core.AlertStream import AlertStream
+from core.AnalyticsStore import AnalyticsStore
+from core.ComparablesIndex import COLUMNS as COMPARABLE_COLUMNS
+from core.ComparablesIndex import ComparablesIndex
 from core.Database import Database
+from core.DuplicateIndex import COLUMNS as DUPLICATE_COLUMNS
+from core.DuplicateIndex import DuplicateIndex
 
 # from LocationsScraper import LocationsScraper
 from core.Logger import Logger
+from core.MarketMetrics import latest_snapshot
+from core.Metrics import Metrics
+from core.PriceHistory import PriceHistory
+from scraper.CrawlCheckpoint import CrawlCheckpoint
 from scraper.IdealistaScraper import IdealistaScraper
+from scraper.ListingIndex import ListingIndex
+from scraper.RateLimiter import RateLimiter
+from scraper.ResponseCache import ResponseCache
+from scraper.SqliteWorkQueue import SqliteWorkQueue
 
 
-async def main():
-    logger = Logger(level="DEBUG")
+def below_price_per_square_meter(threshold: float):
+    def accepts(card: dict) -> bool:
+        if not card["price"] or not card["square_meters"]:
+            return False
+        return card["price"] / card["square_meters"] < threshold
+
+    return accepts
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Idealista scraper")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=LOCATION_WORKERS,
+        help="Number of locations crawled at the same time",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=MAX_CONCURRENT_REQUESTS,
+        help="Maximum number of requests in flight across all locations",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help="Processes used to parse pages (0 parses on the event loop)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch detail pages for new listings or listings whose price changed",
+    )
+    parser.add_argument(
+        "--listing-index",
+        default=LISTING_INDEX_PATH,
+        help="Path of the local index of known listings used by --incremental",
+    )
+    parser.add_argument(
+        "--list-only",
+        action="store_true",
+        help="Store partial properties from the result cards, without detail pages",
+    )
+    parser.add_argument(
+        "--details-below-eur-m2",
+        type=float,
+        help="With --list-only, fetch details for cards below this price per m²",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Store fetched responses in the on-disk response cache",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help=(
+            "Run against the response cache only, without requesting Idealista;"
+            " locations are read from the database but nothing is written to it"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=RESPONSE_CACHE_DIR,
+        help="Directory of the response cache used by --cache and --replay",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Expose Prometheus metrics on http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Periodically write Prometheus metrics to this file",
+    )
+    parser.add_argument(
+        "--analytics",
+        action="store_true",
+        help="Mirror saved properties into the local Parquet analytics store",
+    )
+    parser.add_argument(
+        "--analytics-dir",
+        default=ANALYTICS_DIR,
+        help="Directory of the analytics store used by --analytics",
+    )
+    parser.add_argument(
+        "--alerts",
+        action="store_true",
+        help="Score new listings against their comparables and alert on cheap ones",
+    )
+    parser.add_argument(
+        "--alert-discount",
+        type=float,
+        default=ALERT_DISCOUNT,
+        help="Alert when a listing is this fraction below its estimated value",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help=(
+            "Detect listings duplicated across agencies, counted once in the "
+            "stats; only within the run unless --analytics is on"
+        ),
+    )
+    parser.add_argument(
+        "--price-history",
+        action="store_true",
+        help="Log price changes and delistings of the crawled listings",
+    )
+    parser.add_argument(
+        "--price-history-dir",
+        default=PRICE_HISTORY_DIR,
+        help="Directory of the price history used by --price-history",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="DEBUG",
+        help="Lowest level logged to stdout and app.log",
+    )
+    parser.add_argument(
+        "--log-enqueue",
+        action="store_true",
+        help="Write the logs from a background thread, for slow log sinks",
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="Log one JSON object per line instead of text",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last interrupted crawl instead of starting over",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=CHECKPOINT_PATH,
+        help="Path of the crawl checkpoint written during every run",
+    )
+    parser.add_argument(
+        "--work-queue",
+        help="Share the crawl with other workers through this SQLite work queue",
+    )
+    parser.add_argument(
+        "--cycle",
+        help="Crawl cycle shared through --work-queue (default: today's UTC date)",
+    )
+    args = parser.parse_args()
+    if args.resume and args.work_queue:
+        parser.error(
+            "--resume is for single worker runs, --work-queue re-leases on its own"
+        )
+    return args
+
+
+async def main(args: argparse.Namespace):
+    logger = Logger(
+        level=args.log_level, enqueue=args.log_enqueue, serialize=args.log_json
+    )
     database = Database(logger)
+    if args.replay:
+        # Cached pages may be days old: never upsert their prices over live rows.
+        database = InMemoryDatabase(database.get_locations())
+    # Replayed responses come from disk, there is nobody to be polite to.
+    rate_limiter = RateLimiter(float("inf")) if args.replay else RateLimiter()
+    response_cache = (
+        ResponseCache(logger, args.cache_dir) if args.cache or args.replay else None
+    )
+    metrics = Metrics(enabled=bool(args.metrics_port or args.metrics_file))
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    if args.metrics_file:
+        metrics.dump_periodically(args.metrics_file, METRICS_DUMP_INTERVAL)
+    listing_index = (
+        ListingIndex(logger, args.listing_index) if args.incremental else None
+    )
+    analytics_store = (
+        AnalyticsStore(logger, args.analytics_dir) if args.analytics else None
+    )
+    comparables = ComparablesIndex() if args.alerts else None
+    if comparables is not None and analytics_store is not None:
+        comparables.add_table(
+            latest_snapshot(
+                analytics_store.load(columns=[*COMPARABLE_COLUMNS, "scrape_date"])
+            )
+        )
+        logger.info(f"🏘️ Loaded {len(comparables)} comparables")
+    duplicates = DuplicateIndex() if args.dedupe else None
+    if duplicates is not None and analytics_store is not None:
+        duplicates.add_table(
+            latest_snapshot(
+                analytics_store.load(columns=[*DUPLICATE_COLUMNS, "scrape_date"])
+            )
+        )
+        logger.info(f"🪞 Loaded {len(duplicates)} listings to dedupe against")
+
+    # Shared crawls recover through leases; a checkpoint file per worker
+    # would be reset by every worker that starts.
+    work_queue = SqliteWorkQueue(logger, args.work_queue) if args.work_queue else None
+    checkpoint = (
+        CrawlCheckpoint(logger, args.checkpoint) if work_queue is None else None
+    )
+    price_history = None
+    if args.price_history:
+        # Workers sharing a crawl append to their own log of the history.
+        price_history = PriceHistory(
+            logger,
+            args.price_history_dir,
+            writer=(
+                f"prices-{socket.gethostname()}-{os.getpid()}"
+                if work_queue
+                else "prices"
+            ),
+        )
 
-    #  locations_scraper = LocationsScraper(logger, database)
+    #  locations_scraper = LocationsScraper(logger, database, rate_limiter)
     # await locations_scraper.run()
-    idealista_scraper = IdealistaScraper(database, logger)
-    await idealista_scraper.run()
+    idealista_scraper = IdealistaScraper(
+        database,
+        logger,
+        rate_limiter,
+        max_concurrency=args.max_concurrency,
+        location_workers=args.workers,
+        parse_workers=args.parse_workers,
+        listing_index=listing_index,
+        response_cache=response_cache,
+        replay=args.replay,
+        metrics=metrics,
+        list_only=args.list_only,
+        detail_filter=(
+            below_price_per_square_meter(args.details_below_eur_m2)
+            if args.details_below_eur_m2
+            else None
+        ),
+        analytics_store=analytics_store,
+        checkpoint=checkpoint,
+        resume=args.resume,
+        work_queue=work_queue,
+        cycle_id=args.cycle,
+        comparables=comparables,
+        alerts=AlertStream(logger) if args.alerts else None,
+        alert_discount=args.alert_discount,
+        price_history=price_history,
+        duplicates=duplicates,
+    )
+    try:
+        await idealista_scraper.run()
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        if work_queue is not None:
+            work_queue.close()
+        if listing_index is not None:
+            listing_index.close()
+        if price_history is not None:
+            price_history.close()
+        if response_cache is not None:
+            response_cache.close()
+        if args.metrics_file:
+            metrics.dump(args.metrics_file)
+        metrics.close()
+        logger.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))